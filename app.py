@@ -1,194 +1,545 @@
-from flask import Flask, jsonify, request
+from flask import Flask, Response, jsonify, request
 from flask_cors import CORS  # Enable cross-origin requests
+from flask_sock import Sock  # WebSocket routes for live scan sessions
+from dataclasses import replace
+from functools import wraps
 import cv2
 import numpy as np
 import base64
+import json
+import os
+import time
+from measurement import (ALIGNMENT_HINTS, QUALITY_ERRORS, SERVER_CONFIG, CalibrationStore, FaceTracker,
+                         ScaleCalibration, SessionStore, StreamingEstimator, aggregate_measurements, init_worker,
+                         measure)
+from frame_cache import FrameCache, dhash, encoded_frame_hash
+from frame_pool import FramePool, PoolBrokenError, PoolBusyError, PoolTimeoutError
+from mesh import clamp_parameters, encoded_mesh, fit_frame, fitted_obj
+from mesh.binary import CONTENT_TYPE as MESH_CONTENT_TYPE
+from metrics import CONTENT_TYPE, Registry, SamplingProfiler
 
 app = Flask(__name__)
 CORS(app)
+sock = Sock(app)
 
-KNOWN_DISTANCE_MM = 63  
+MAX_BATCH_FRAMES = 30          # Upper bound on frames accepted by /api/measure/batch.
+SESSION_MAX_FRAMES = 300       # A live session gives up after this many frames without converging.
+SESSION_IDLE_TIMEOUT_S = 30    # A live session is closed when no frame arrives for this long.
 
-# Load Haar cascade files
-face_cascade = cv2.CascadeClassifier(cv2.data.haarcascades + 'haarcascade_frontalface_default.xml')
-eye_cascade  = cv2.CascadeClassifier(cv2.data.haarcascades + 'haarcascade_eye.xml')
+ERROR_BUSY = "Server is busy. Please try again shortly."
+ERROR_TIMEOUT = "Measurement timed out. Please try again."
+ERROR_WORKER_CRASHED = "A measurement worker crashed. Please try again."
+ERROR_DECODE = "Could not decode image."
+ERROR_IMAGE_TYPE = "Each image must be a base64-encoded string."
+ERROR_NOT_STABLE = "Could not get a stable measurement. Please hold still and try again."
 
-def is_face_centered(face_x, face_y, face_w, face_h, frame_width, frame_height):
-    """Checks if the detected face is centered and large enough."""
-    center_x = face_x + face_w // 2
-    center_y = face_y + face_h // 2
-    tolerance_x = frame_width * 0.2  
-    tolerance_y = frame_height * 0.2  
-    min_face_height = frame_height * 0.3  
-    return (
-        (frame_width // 2 - tolerance_x < center_x < frame_width // 2 + tolerance_x) and
-        (frame_height // 2 - tolerance_y < center_y < frame_height // 2 + tolerance_y) and
-        (face_h > min_face_height)
-    )
+# Body types accepted by /api/measure/raw without a ?format= parameter.
+RAW_IMAGE_TYPES = ('image/jpeg', 'image/png', 'application/octet-stream')
+# Uncompressed layouts accepted by /api/measure/raw, as the number of 8-bit chroma
+# samples per 2x2 block after the luma plane. All of them start with a
+# full-resolution 8-bit luma plane, which is all the engine needs.
+RAW_PLANE_FORMATS = {'gray': 0, 'i420': 2, 'nv12': 2}
 
-def detect_iris_boundaries(eye_roi):
+# Worker pool configuration. MEASURE_WORKERS=0 processes frames inside the request thread.
+WORKER_PROCESSES = int(os.environ.get('MEASURE_WORKERS', os.cpu_count() or 1))
+MAX_QUEUED_FRAMES = int(os.environ.get('MEASURE_MAX_QUEUED_FRAMES', 64))
+FRAME_TIMEOUT_S = float(os.environ.get('MEASURE_TIMEOUT_S', 10))
+
+# Near-duplicate frames of one session (a user holding still, a retry) are answered from a cache.
+# Clients name their session with this header; MEASURE_FRAME_CACHE_TTL_S=0 disables the cache.
+SESSION_HEADER = 'X-Session-ID'
+FRAME_CACHE_TTL_S = float(os.environ.get('MEASURE_FRAME_CACHE_TTL_S', 10))
+FRAME_CACHE_DISTANCE = int(os.environ.get('MEASURE_FRAME_CACHE_DISTANCE', 4))
+# A session's previous frame is compared with the next for the motion check only if it is this recent.
+MOTION_WINDOW_S = float(os.environ.get('MEASURE_MOTION_WINDOW_S', 1))
+
+# Faces are searched on a copy downscaled to this width; eyes and irises are refined at full resolution.
+MEASUREMENT_CONFIG = replace(SERVER_CONFIG, detection_width=int(os.environ.get('MEASURE_DETECTION_WIDTH', 640)))
+
+frame_pool = FramePool(WORKER_PROCESSES, MAX_QUEUED_FRAMES, FRAME_TIMEOUT_S, initializer=init_worker)
+frame_cache = FrameCache(ttl_s=FRAME_CACHE_TTL_S, max_distance=FRAME_CACHE_DISTANCE)
+# Each session's pixel scale is calibrated over its first frames and reused for the rest.
+calibrations = CalibrationStore(MEASUREMENT_CONFIG.calibration_frames, MEASUREMENT_CONFIG.recalibration_face_change,
+                                MEASUREMENT_CONFIG.recalibration_scale_change)
+# Quality-gate thumbnail of each session's last frame, so REST frames get the motion check too.
+thumbnails = SessionStore(ttl_s=MOTION_WINDOW_S)
+
+# Prometheus metrics served on /metrics.
+registry = Registry()
+REQUESTS = registry.counter('measure_requests_total', 'HTTP requests by endpoint and status code.', ('endpoint', 'status'))
+REQUEST_SECONDS = registry.histogram('measure_request_seconds', 'End-to-end HTTP request latency.', ('endpoint',))
+IN_FLIGHT = registry.gauge('measure_in_flight_requests', 'HTTP requests currently being handled.', ('endpoint',))
+ACTIVE_SESSIONS = registry.gauge('measure_active_sessions', 'Open live measurement sessions.')
+STAGE_SECONDS = registry.histogram('measure_stage_seconds', 'Latency of each measurement stage per frame.', ('stage',))
+ERRORS = registry.counter('measure_errors_total', 'Error messages returned to clients.', ('error',))
+QUALITY_REJECTIONS = registry.counter('measure_quality_rejections_total', 'Frames rejected by the quality gate by reason.', ('reason',))
+FRAME_CACHE_LOOKUPS = registry.counter('measure_frame_cache_lookups_total', 'Near-duplicate frame cache lookups by result.', ('result',))
+FRAME_CACHE_ENTRIES = registry.gauge('measure_frame_cache_entries', 'Frame results held by the near-duplicate frame cache.')
+FRAME_CACHE_SESSIONS = registry.gauge('measure_frame_cache_sessions', 'Sessions with entries in the near-duplicate frame cache.')
+FRAME_CACHE_EVICTIONS = registry.gauge('measure_frame_cache_evictions', 'Frame cache entries evicted or expired since start.')
+
+# Opt-in sampling profiler: MEASURE_PROFILE_SAMPLE_RATE=0.05 profiles 5% of requests, see /debug/profile.
+# It profiles the request thread, so set MEASURE_WORKERS=0 to include the measurement pipeline itself.
+profiler = SamplingProfiler(float(os.environ.get('MEASURE_PROFILE_SAMPLE_RATE', 0)))
+
+def instrumented(view):
+    """Records latency, status and in-flight count of an HTTP view, and samples it for profiling."""
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        endpoint = request.endpoint
+        started = time.perf_counter()
+        with IN_FLIGHT.track_inprogress(endpoint=endpoint), profiler.maybe_profile():
+            response = app.make_response(view(*args, **kwargs))
+        REQUEST_SECONDS.observe(time.perf_counter() - started, endpoint=endpoint)
+        REQUESTS.inc(endpoint=endpoint, status=response.status_code)
+        return response
+    return wrapper
+
+# Quality gate reason of each error it returns, for QUALITY_REJECTIONS.
+QUALITY_REASONS = {error: reason for reason, error in QUALITY_ERRORS.items()}
+
+def record_frame(timings, error_msg):
+    """Records the stage timings of a measured frame and counts a quality gate rejection."""
+    for stage, seconds in timings.items():
+        STAGE_SECONDS.observe(seconds, stage=stage)
+    if error_msg in QUALITY_REASONS:
+        QUALITY_REJECTIONS.inc(reason=QUALITY_REASONS[error_msg])
+
+def process_frame(frame, tracker=None, timings=None, calibration=None):
+    """
+    Process a single frame (already decoded as a BGR image) to detect face/eyes
+    and perform measurements. Returns a dictionary with measurements or an error.
+    When a FaceTracker from the previous frame of the same session is given, the
+    cascades only search around the tracked face and eyes, and the tracker is updated.
+    Likewise the session's ScaleCalibration, when given, provides and is updated with the scale.
+    Per-stage durations are added to `timings` when a dict is passed.
     """
-    Detects the iris boundaries using HoughCircles.
-    Returns (left_boundary, right_boundary) relative to the eye ROI.
+    result = measure(frame, MEASUREMENT_CONFIG, tracker, calibration)
+    if timings is not None:
+        timings.update(result.timings)
+    if result.error:
+        return None, result.error
+    return {**result.measurement, 'detection_scale': result.detection_scale}, None
+
+def decode_base64_image(img_data):
     """
-    try:
-        gray_eye = cv2.cvtColor(eye_roi, cv2.COLOR_BGR2GRAY)
-    except Exception:
-        return None, None
-    gray_eye = cv2.medianBlur(gray_eye, 5)
-    circles = cv2.HoughCircles(
-        gray_eye,
-        cv2.HOUGH_GRADIENT,
-        dp=1,
-        minDist=gray_eye.shape[0] / 2,
-        param1=50,
-        param2=30,
-        minRadius=5,
-        maxRadius=int(gray_eye.shape[0] / 2)
-    )
-    if circles is not None:
-        circles = np.around(circles[0, :]).astype(int)
-        x, y, r = circles[0]  
-        return int(x - r), int(x + r)
-    return None, None
-
-def detect_pupil_center(eye_roi):
-    """
-    Detects the pupil center using HoughCircles.
-    Returns the (x, y) coordinates relative to the eye ROI.
+    Decodes a base64 (optionally data-URL prefixed) string into the encoded image bytes.
+    Returns None if the data is not a string or not valid base64.
     """
+    if not isinstance(img_data, (str, bytes)):
+        return None
+    separator = "," if isinstance(img_data, str) else b","
+    if separator in img_data:
+        # Remove data URL header if present
+        img_data = img_data.split(separator)[1]
     try:
-        gray_eye = cv2.cvtColor(eye_roi, cv2.COLOR_BGR2GRAY)
+        return base64.b64decode(img_data)
     except Exception:
         return None
-    gray_eye = cv2.medianBlur(gray_eye, 5)
-    circles = cv2.HoughCircles(
-        gray_eye,
-        cv2.HOUGH_GRADIENT,
-        dp=1,
-        minDist=gray_eye.shape[0] / 2,
-        param1=50,
-        param2=30,
-        minRadius=3,
-        maxRadius=20
-    )
-    if circles is not None:
-        circles = np.around(circles[0, :]).astype(int)
-        x, y, r = circles[0]
-        return int(x), int(y)
-    return None
-
-def process_frame(frame):
+
+def measure_encoded_image(encoded, tracker=None, calibration=None):
     """
-    Process a single frame (already decoded as a BGR image) to detect face/eyes
-    and perform measurements. Returns a dictionary with measurements or an error.
+    Decodes an encoded (JPEG/PNG) image and measures it.
+    Runs inside the worker pool, so the decode is also kept off the request thread.
+    Returns (measurement, error, timings, tracker, calibration); the tracker and
+    calibration are handed back because a worker process updates its own copies.
     """
+    started = time.perf_counter()
+    frame = cv2.imdecode(np.frombuffer(encoded, np.uint8), cv2.IMREAD_COLOR) if encoded else None
+    timings = {'image_decode': time.perf_counter() - started}
     if frame is None:
-        return None, "Invalid image data."
-
-    frame_height, frame_width = frame.shape[:2]
-    gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
-    # Adjusted parameters for better detection on webcam images
-    faces = face_cascade.detectMultiScale(gray, scaleFactor=1.1, minNeighbors=4, minSize=(50, 50))
-
-    if len(faces) == 0:
-        return None, "No face detected. Please ensure your face is visible and well-lit."
-
-    for (x, y, w, h) in faces:
-        if not is_face_centered(x, y, w, h, frame_width, frame_height):
-            continue 
-
-        roi_gray = gray[y:y+h, x:x+w]
-        roi_color = frame[y:y+h, x:x+w]
-        # Adjust eye detection parameters for better results
-        eyes = eye_cascade.detectMultiScale(roi_gray, scaleFactor=1.1, minNeighbors=3, minSize=(20, 20))
-        if len(eyes) < 2:
-            return None, "Not enough eyes detected. Please center your face properly."
-
-        # Sort eyes based on x-coordinate (left to right)
-        eye_boxes = sorted(eyes, key=lambda b: b[0])
-        left_eye = eye_boxes[0]
-        right_eye = eye_boxes[1]
-
-        left_eye_roi = roi_color[left_eye[1]:left_eye[1] + left_eye[3], left_eye[0]:left_eye[0] + left_eye[2]]
-        right_eye_roi = roi_color[right_eye[1]:right_eye[1] + right_eye[3], right_eye[0]:right_eye[0] + right_eye[2]]
-
-        left_boundaries = detect_iris_boundaries(left_eye_roi)
-        right_boundaries = detect_iris_boundaries(right_eye_roi)
-        left_pupil = detect_pupil_center(left_eye_roi)
-        right_pupil = detect_pupil_center(right_eye_roi)
-
-        if (left_boundaries[0] is not None and right_boundaries[1] is not None and 
-            left_pupil is not None and right_pupil is not None):
-            left_iris_global = left_eye[0] + left_boundaries[0]
-            right_iris_global = right_eye[0] + right_boundaries[1]
-            eye_total_width_pixels = right_iris_global - left_iris_global
-
-            left_pupil_global = left_eye[0] + left_pupil[0]
-            right_pupil_global = right_eye[0] + right_pupil[0]
-            interpupil_distance_pixels = right_pupil_global - left_pupil_global
-
-            if interpupil_distance_pixels > 0:
-                pixel_to_mm_ratio = KNOWN_DISTANCE_MM / interpupil_distance_pixels
-            else:
-                pixel_to_mm_ratio = 1 
-            eye_width_mm = round(eye_total_width_pixels * pixel_to_mm_ratio, 2)
-        else:
-            avg_eye_width = (left_eye[2] + right_eye[2]) / 2
-            left_center = left_eye[0] + left_eye[2] / 2
-            right_center = right_eye[0] + right_eye[2] / 2
-            interpupil_distance_pixels = right_center - left_center
-            if interpupil_distance_pixels > 0:
-                pixel_to_mm_ratio = KNOWN_DISTANCE_MM / interpupil_distance_pixels
-            else:
-                pixel_to_mm_ratio = 1
-            eye_width_mm = round(avg_eye_width * pixel_to_mm_ratio, 2)
-
-        bridge_distance_pixels = right_eye[0] - (left_eye[0] + left_eye[2])
-        bridge_width_mm = round(bridge_distance_pixels * pixel_to_mm_ratio, 2)
-
-        left_eye_height = min(left_eye[3], int(left_eye[2] * 0.6))
-        right_eye_height = min(right_eye[3], int(right_eye[2] * 0.6))
-        b_size_pixels = max(left_eye_height, right_eye_height)
-        b_size_mm = round(b_size_pixels * pixel_to_mm_ratio, 2)
-
-        measurement = {
-            'eye_width_mm': eye_width_mm,
-            'bridge_width_mm': bridge_width_mm,
-            'b_size_mm': b_size_mm
-        }
-        return measurement, None
-
-    return None, "No centered face found. Please adjust your position."
+        return None, ERROR_DECODE, timings, tracker, calibration
+    measurement, error_msg = process_frame(frame, tracker, timings, calibration)
+    return measurement, error_msg, timings, tracker, calibration
+
+def raw_frame_size(plane_format, width, height):
+    """
+    Bytes in an uncompressed frame: the luma plane plus the 4:2:0 chroma, whose
+    planes are rounded up to whole samples for odd widths and heights.
+    """
+    return width * height + RAW_PLANE_FORMATS[plane_format] * ((width + 1) // 2) * ((height + 1) // 2)
+
+def measure_luma_plane(buffer, width, height, tracker=None, calibration=None):
+    """
+    Measures an uncompressed frame from the 8-bit luma plane at the start of
+    `buffer`. The plane is viewed in place, so no image decode or copy happens.
+    Returns the same tuple as measure_encoded_image.
+    """
+    timings = {}
+    gray = np.frombuffer(buffer, np.uint8, count=width * height).reshape(height, width)
+    measurement, error_msg = process_frame(gray, tracker, timings, calibration)
+    return measurement, error_msg, timings, tracker, calibration
+
+def measure_in_pool(encoded_images):
+    """
+    Measures the encoded images on the worker pool within one request deadline.
+    Returns a list of (measurement, error) tuples in input order.
+    Raises PoolBusyError, PoolTimeoutError or PoolBrokenError.
+    """
+    deadline = frame_pool.deadline()
+    futures = frame_pool.submit_many(measure_encoded_image, [(encoded,) for encoded in encoded_images])
+    results = []
+    try:
+        for future in futures:
+            measurement, error_msg, timings, _, _ = frame_pool.result(future, deadline)
+            record_frame(timings, error_msg)
+            results.append((measurement, error_msg))
+    except BaseException:
+        # The request has failed: free the workers and queue slots of the frames not yet started.
+        for future in futures:
+            future.cancel()
+        raise
+    return results
+
+def caches_frames(session_id):
+    """Whether frames of this request go through the frame cache, and so need a hash."""
+    return bool(session_id) and FRAME_CACHE_TTL_S > 0
+
+def cached_result(session_id, frame_hash):
+    """
+    Returns the (measurement, error) stored for a near-duplicate of this frame
+    in the same session, or None. Frames without a session or hash are never cached.
+    """
+    if not caches_frames(session_id) or frame_hash is None:
+        return None
+    result = frame_cache.lookup(session_id, frame_hash)
+    FRAME_CACHE_LOOKUPS.inc(result='miss' if result is None else 'hit')
+    return result
+
+def cache_result(session_id, frame_hash, measurement, error_msg):
+    # Quality gate rejections are not cached: they depend on the session's previous
+    # frame (motion) and would keep rejecting a now-still user until they expire.
+    if error_msg in QUALITY_REASONS:
+        return
+    if caches_frames(session_id) and frame_hash is not None:
+        frame_cache.store(session_id, frame_hash, (measurement, error_msg))
+
+def measure_frame(call, frame_hash, session_id=None):
+    """
+    Runs call (measure_encoded_image or measure_luma_plane and its arguments) on
+    the pool, unless the session recently sent a near-identical frame, whose
+    result is returned instead. Frames of a session share its scale calibration,
+    and each is checked for motion against the session's previous frame.
+    Returns (measurement, error).
+    Raises PoolBusyError, PoolTimeoutError or PoolBrokenError.
+    """
+    cached = cached_result(session_id, frame_hash)
+    if cached is not None:
+        return cached
+    calibration = tracker = None
+    if session_id:
+        calibration = calibrations.get(session_id)
+        # Only the thumbnail is carried over: REST frames are too far apart to track the face.
+        tracker = FaceTracker(MEASUREMENT_CONFIG.tracker_padding, MEASUREMENT_CONFIG.lost_frame_threshold,
+                              MEASUREMENT_CONFIG.tracker_refresh_interval)
+        tracker.thumbnail = thumbnails.get(session_id)
+    future = frame_pool.submit(*call, tracker, calibration)
+    measurement, error_msg, timings, tracker, calibration = frame_pool.result(future, frame_pool.deadline())
+    if session_id:
+        calibrations.store(session_id, calibration)
+        thumbnails.store(session_id, tracker.thumbnail)
+    record_frame(timings, error_msg)
+    cache_result(session_id, frame_hash, measurement, error_msg)
+    return measurement, error_msg
+
+def error_response(message, status=400, **extra):
+    ERRORS.inc(error=message)
+    return jsonify({"error": message, **extra}), status
+
+def busy_response():
+    response, status = error_response(ERROR_BUSY, 429)
+    response.headers['Retry-After'] = '1'
+    return response, status
+
+def timeout_response():
+    return error_response(ERROR_TIMEOUT, 504)
+
+def broken_response():
+    # The pool restarts its workers on the next request, so a retry is expected to succeed.
+    response, status = error_response(ERROR_WORKER_CRASHED, 503)
+    response.headers['Retry-After'] = '1'
+    return response, status
 
 @app.route('/api/measure', methods=['POST'])
+@instrumented
 def measure_api():
     """
     Expects a JSON payload with an "image" field containing a base64-encoded JPEG.
     Processes the image with OpenCV and returns the measurements.
     """
-    data = request.get_json()
-    if not data or 'image' not in data:
-        return jsonify({"error": "No image provided."}), 400
+    with STAGE_SECONDS.time(stage='json_parse'):
+        data = request.get_json(silent=True)
+    if not isinstance(data, dict) or 'image' not in data:
+        return error_response("No image provided.")
 
-    img_data = data['image']
-    if "," in img_data:
-        # Remove data URL header if present
-        img_data = img_data.split(",")[1]
+    with STAGE_SECONDS.time(stage='base64_decode'):
+        encoded = decode_base64_image(data['image'])
+    if encoded is None:
+        return error_response(ERROR_DECODE)
+
+    session_id = request.headers.get(SESSION_HEADER)
+    frame_hash = None
+    if caches_frames(session_id):
+        with STAGE_SECONDS.time(stage='frame_hash'):
+            frame_hash = encoded_frame_hash(encoded)
     try:
-        decoded = base64.b64decode(img_data)
-        np_data = np.frombuffer(decoded, np.uint8)
-        frame = cv2.imdecode(np_data, cv2.IMREAD_COLOR)
-        if frame is None:
-            return jsonify({"error": "Could not decode image."}), 400
-    except Exception:
-        return jsonify({"error": "Could not decode image."}), 400
+        measurement, error_msg = measure_frame((measure_encoded_image, encoded), frame_hash, session_id)
+    except PoolBusyError:
+        return busy_response()
+    except PoolTimeoutError:
+        return timeout_response()
+    except PoolBrokenError:
+        return broken_response()
+    if error_msg:
+        return error_response(error_msg)
+
+    return jsonify(measurement)
+
+@app.route('/api/measure/batch', methods=['POST'])
+@instrumented
+def measure_batch_api():
+    """
+    Accepts several frames in one request, either as multipart files under the
+    "images" field or as a JSON payload with an "images" array of base64 JPEGs.
+    Returns the per-frame results and an outlier-rejected aggregate measurement.
+    """
+    uploads = request.files.getlist('images')
+    if uploads:
+        encoded_images = [upload.read() for upload in uploads[:MAX_BATCH_FRAMES + 1]]
+    else:
+        with STAGE_SECONDS.time(stage='json_parse'):
+            data = request.get_json(silent=True)
+        if not isinstance(data, dict) or not isinstance(data.get('images'), list):
+            return error_response("No images provided.")
+        for index, img_data in enumerate(data['images'][:MAX_BATCH_FRAMES + 1]):
+            if not isinstance(img_data, (str, bytes)):
+                return error_response(ERROR_IMAGE_TYPE, index=index)
+        with STAGE_SECONDS.time(stage='base64_decode'):
+            encoded_images = [decode_base64_image(img_data) for img_data in data['images'][:MAX_BATCH_FRAMES + 1]]
+
+    if not encoded_images:
+        return error_response("No images provided.")
+    if len(encoded_images) > MAX_BATCH_FRAMES:
+        return error_response(f"Too many images. At most {MAX_BATCH_FRAMES} frames per batch.")
+
+    try:
+        frame_results = measure_in_pool(encoded_images)
+    except PoolBusyError:
+        return busy_response()
+    except PoolTimeoutError:
+        return timeout_response()
+    except PoolBrokenError:
+        return broken_response()
+
+    results = []
+    measurements = []
+    for index, (measurement, error_msg) in enumerate(frame_results):
+        if error_msg:
+            ERRORS.inc(error=error_msg)
+            results.append({"index": index, "error": error_msg})
+        else:
+            results.append({"index": index, **measurement})
+            measurements.append(measurement)
 
-    measurement, error_msg = process_frame(frame)
+    if not measurements:
+        return error_response("No frame could be measured.", frames=results)
+
+    aggregate, inlier_count = aggregate_measurements(measurements)
+    return jsonify({
+        **aggregate,
+        "frames": results,
+        "measured_frames": len(measurements),
+        "inlier_frames": inlier_count
+    })
+
+@app.route('/api/measure/raw', methods=['POST'])
+@instrumented
+def measure_raw_api():
+    """
+    Accepts one frame as the raw request body, skipping JSON and base64 entirely.
+    The body is either an encoded image (image/jpeg, image/png or
+    application/octet-stream), or, with ?format=gray|i420|nv12&width=W&height=H,
+    an uncompressed frame whose luma plane is measured without any image decode.
+    """
+    body = request.get_data(cache=False)
+    if not body:
+        return error_response("No image provided.")
+
+    session_id = request.headers.get(SESSION_HEADER)
+    frame_hash = None
+    plane_format = request.args.get('format')
+    if plane_format is None:
+        if request.mimetype not in RAW_IMAGE_TYPES:
+            return error_response(f"Unsupported content type. Use one of: {', '.join(RAW_IMAGE_TYPES)}.", 415)
+        call = (measure_encoded_image, body)
+        if caches_frames(session_id):
+            with STAGE_SECONDS.time(stage='frame_hash'):
+                frame_hash = encoded_frame_hash(body)
+    else:
+        if plane_format not in RAW_PLANE_FORMATS:
+            return error_response(f"Unsupported format. Use one of: {', '.join(RAW_PLANE_FORMATS)}.")
+        width = request.args.get('width', type=int)
+        height = request.args.get('height', type=int)
+        if not width or not height or width <= 0 or height <= 0:
+            return error_response("Raw frames need positive width and height parameters.")
+        if len(body) != raw_frame_size(plane_format, width, height):
+            return error_response("Frame size does not match width, height and format.")
+        call = (measure_luma_plane, body, width, height)
+        if caches_frames(session_id):
+            with STAGE_SECONDS.time(stage='frame_hash'):
+                frame_hash = dhash(np.frombuffer(body, np.uint8, count=width * height).reshape(height, width))
+
+    try:
+        measurement, error_msg = measure_frame(call, frame_hash, session_id)
+    except PoolBusyError:
+        return busy_response()
+    except PoolTimeoutError:
+        return timeout_response()
+    except PoolBrokenError:
+        return broken_response()
     if error_msg:
-        return jsonify({"error": error_msg}), 400
+        return error_response(error_msg)
 
     return jsonify(measurement)
 
+@sock.route('/ws/measure')
+def measure_session(ws):
+    """
+    Live measurement session. The client sends binary JPEG frames, one per message,
+    and gets a JSON message back for each: {"type": "hint"} with an alignment hint,
+    or {"type": "measurement"} with the frame result and the running estimate.
+    The session ends with {"type": "done"} once the estimate has converged, or with
+    {"type": "error"} if it does not converge within SESSION_MAX_FRAMES frames.
+    """
+    with ACTIVE_SESSIONS.track_inprogress():
+        run_session(ws)
+    ws.close()
+
+def run_session(ws):
+    """
+    Handles the frames of one live session until it converges, fails, is stopped or goes idle.
+    Every frame is measured: a near-duplicate frame answered from the frame cache
+    would add the same measurement to the estimator again and fake convergence.
+    """
+    estimator = StreamingEstimator()
+    tracker = FaceTracker(MEASUREMENT_CONFIG.tracker_padding, MEASUREMENT_CONFIG.lost_frame_threshold,
+                          MEASUREMENT_CONFIG.tracker_refresh_interval)
+    calibration = ScaleCalibration(MEASUREMENT_CONFIG.calibration_frames, MEASUREMENT_CONFIG.recalibration_face_change,
+                                   MEASUREMENT_CONFIG.recalibration_scale_change)
+    for _ in range(SESSION_MAX_FRAMES):
+        data = ws.receive(timeout=SESSION_IDLE_TIMEOUT_S)
+        if data is None:
+            return
+        if isinstance(data, str):
+            # Text messages are control messages; the only one understood is a stop request.
+            try:
+                if json.loads(data).get("type") == "stop":
+                    break
+            except (ValueError, AttributeError):
+                pass
+            continue
+
+        try:
+            future = frame_pool.submit(measure_encoded_image, data, tracker, calibration)
+            measurement, error_msg, timings, tracker, calibration = frame_pool.result(future, frame_pool.deadline())
+            record_frame(timings, error_msg)
+        except PoolBusyError:
+            error_msg = ERROR_BUSY
+        except PoolTimeoutError:
+            error_msg = ERROR_TIMEOUT
+        except PoolBrokenError:
+            error_msg = ERROR_WORKER_CRASHED
+        if error_msg:
+            ERRORS.inc(error=error_msg)
+            ws.send(json.dumps({
+                "type": "hint",
+                "hint": ALIGNMENT_HINTS.get(error_msg, error_msg),
+                "message": error_msg
+            }))
+            continue
+
+        estimator.add(measurement)
+        if estimator.converged():
+            ws.send(json.dumps({"type": "done", "samples": len(estimator), **estimator.estimate()}))
+            return
+        ws.send(json.dumps({
+            "type": "measurement",
+            "frame": measurement,
+            "estimate": estimator.estimate(),
+            "samples": len(estimator)
+        }))
+    else:
+        ERRORS.inc(error=ERROR_NOT_STABLE)
+        ws.send(json.dumps({"type": "error", "message": ERROR_NOT_STABLE}))
+
+def frame_parameters():
+    """
+    The frame parameters of a /api/frames request: the scanned eye width mapped
+    to a lens width, in deform order, clamped to the template's range. Returns (params, warning), warning being a Warning
+    header value naming the clamped parameters, or None. Raises ValueError.
+    """
+    params, clamped = clamp_parameters(request.args.get('eye_width_mm'),
+                                       request.args.get('bridge_width_mm'),
+                                       request.args.get('b_size_mm'))
+    if not clamped:
+        return params, None
+    text = ', '.join(f"{name} clamped to {value:g} mm" for name, value in clamped.items())
+    app.logger.warning("Frame parameters out of range: %s", text)
+    return params, f'299 - "{text}"'
+
+def frame_response(data, content_type, warning):
+    response = Response(data, content_type=content_type)
+    if warning:
+        response.headers['Warning'] = warning
+    # The mesh depends only on the query string, so browsers may keep it.
+    response.headers['Cache-Control'] = 'public, max-age=86400'
+    return response
+
+@app.route('/api/frames/model.obj')
+@instrumented
+def frame_model_api():
+    """
+    Returns the frame template fitted to the eye_width_mm, bridge_width_mm and
+    b_size_mm query parameters as an OBJ mesh, the eye width being mapped to a
+    lens width first. Missing parameters keep the template's value and
+    out-of-range ones are clamped, with a Warning header.
+    Fitted meshes are cached per parameter set.
+    """
+    try:
+        params, warning = frame_parameters()
+    except ValueError as exc:
+        return error_response(str(exc))
+    return frame_response(fitted_obj(*params), 'text/plain; charset=utf-8', warning)
+
+@app.route('/api/frames/model.bin')
+@instrumented
+def frame_model_binary_api():
+    """
+    Same fitted frame as /api/frames/model.obj in the quantized binary format of
+    mesh.binary, with a strong ETag so revalidation answers 304 without a body.
+    """
+    try:
+        params, warning = frame_parameters()
+    except ValueError as exc:
+        return error_response(str(exc))
+    data, etag = encoded_mesh(fit_frame(*params))
+    response = frame_response(data, MESH_CONTENT_TYPE, warning)
+    response.set_etag(etag)
+    return response.make_conditional(request)
+
+@app.route('/metrics')
+def metrics_api():
+    """Prometheus scrape endpoint for this process."""
+    stats = frame_cache.stats()
+    FRAME_CACHE_ENTRIES.set(len(frame_cache))
+    FRAME_CACHE_SESSIONS.set(stats['sessions'])
+    FRAME_CACHE_EVICTIONS.set(stats['evictions'])
+    return Response(registry.render(), content_type=CONTENT_TYPE)
+
+@app.route('/debug/profile')
+def profile_api():
+    """Accumulated sampling-profiler stats; empty unless MEASURE_PROFILE_SAMPLE_RATE is set."""
+    return Response(profiler.report(), content_type='text/plain; charset=utf-8')
+
 if __name__ == '__main__':
     app.run(debug=True)
@@ -144,7 +144,11 @@ export default function MeasurementPage() {
                             Rescan
                         </Button>
                         <Button 
-                            onClick={() => router.push('/review')}
+                            onClick={() => router.push(`/review?${new URLSearchParams({
+                                eye_width_mm: eyeWidth,
+                                bridge_width_mm: bridgeWidth,
+                                b_size_mm: bSize,
+                            }).toString()}`)}
                             className="flex-1 bg-black hover:bg-blue-600 transition-colors py-6 text-lg"
                         >
                             Next Step
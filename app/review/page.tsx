@@ -1,11 +1,12 @@
 'use client';
 
-import GlassesModel from '@/components/GlassesModel';
+import GlassesModel, { fittedModelUrl } from '@/components/GlassesModel';
 import ProgressBar from '@/components/ProgressBar';
 import { Button } from '@/components/ui/button';
 import { Canvas } from '@react-three/fiber';
 import { ArrowLeft } from 'lucide-react';
 import Link from 'next/link';
+import { useSearchParams } from 'next/navigation';
 import React from 'react';
 
 const steps = [
@@ -16,6 +17,15 @@ const steps = [
 ];
 
 export default function Review() {
+  const searchParams = useSearchParams();
+  const eyeWidth = searchParams.get('eye_width_mm');
+  const bridgeWidth = searchParams.get('bridge_width_mm');
+  const bSize = searchParams.get('b_size_mm');
+  // Show the customer's own fitted frames when measurements are available.
+  const modelUrl = eyeWidth && bridgeWidth && bSize
+    ? fittedModelUrl({ eyeWidth, bridgeWidth, bSize })
+    : undefined;
+
   return (
     <main className="flex flex-col items-center justify-center p-4">
       <h1 className="text-4xl font-bold text-center mb-4 text-gray-800">Frames Model Complete!</h1>
@@ -36,7 +46,7 @@ export default function Review() {
       <div className="absolute w-full h-full bottom-0 z-0">
                 <Canvas camera={{ fov: 35, zoom: 8, near: 1, far: 1000 }}>
                     <ambientLight intensity={0} />
-                    <GlassesModel />
+                    <GlassesModel url={modelUrl} />
                 </Canvas>
             </div>
       <ProgressBar index={4} steps={steps}/>
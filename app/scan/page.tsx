@@ -21,6 +21,11 @@ export default function ScanPage() {
   const router = useRouter();
   const [scanning, setScanning] = useState(false);
   const [error, setError] = useState<string | null>(null);
+  const [hint, setHint] = useState<string | null>(null);
+  const sessionRef = useRef<WebSocket | null>(null);
+  // Identifies this page's uploads, so the server can answer repeated near-identical frames from its cache.
+  // Created on first upload: randomUUID is only available in secure contexts (https or localhost).
+  const sessionIdRef = useRef<string | null>(null);
 
   // Request access to the user's webcam.
   useEffect(() => {
@@ -41,49 +46,75 @@ export default function ScanPage() {
     initCamera();
   }, []);
 
-  const startScan = async () => {
-    setScanning(true);
-    setError(null);
+  // Closes any open measurement session when leaving the page.
+  useEffect(() => () => sessionRef.current?.close(), []);
+
+  const showMeasurements = (data: { eye_width_mm: number; bridge_width_mm: number; b_size_mm: number }) => {
+    // Automatically navigate to the Measurement page with query parameters.
+    router.push(
+      `/measurement?eye_width_mm=${data.eye_width_mm}&bridge_width_mm=${data.bridge_width_mm}&b_size_mm=${data.b_size_mm}`
+    );
+  };
+
+  const sessionId = () => {
+    if (sessionIdRef.current === null) {
+      sessionIdRef.current = typeof crypto.randomUUID === 'function'
+        ? crypto.randomUUID()
+        : Array.from(crypto.getRandomValues(new Uint8Array(16)), (b) => b.toString(16).padStart(2, '0')).join('');
+    }
+    return sessionIdRef.current;
+  };
+
+  // Draws the current video frame onto a canvas, or reports why it could not.
+  const captureCanvas = (): HTMLCanvasElement | null => {
+    if (!videoRef.current) {
+      setError("Video not available.");
+      return null;
+    }
+    const video = videoRef.current;
+    // Ensure the video is ready (non-zero dimensions)
+    if (video.videoWidth === 0 || video.videoHeight === 0) {
+      setError("Video not ready. Please wait a moment and try again.");
+      return null;
+    }
+    const canvas = document.createElement('canvas');
+    canvas.width = video.videoWidth;
+    canvas.height = video.videoHeight;
+    const ctx = canvas.getContext('2d');
+    if (!ctx) {
+      setError("Could not get canvas context.");
+      return null;
+    }
+    ctx.drawImage(video, 0, 0, canvas.width, canvas.height);
+    return canvas;
+  };
+
+  // Single-frame fallback used when the live session endpoint is unavailable.
+  const measureSingleFrame = async () => {
     try {
-      if (!videoRef.current) {
-        setError("Video not available.");
+      const canvas = captureCanvas();
+      if (!canvas) {
         setScanning(false);
         return;
       }
-      const video = videoRef.current;
-      // Ensure the video is ready (non-zero dimensions)
-      if (video.videoWidth === 0 || video.videoHeight === 0) {
-        setError("Video not ready. Please wait a moment and try again.");
+      const blob = await new Promise<Blob | null>((resolve) => canvas.toBlob(resolve, 'image/jpeg'));
+      if (!blob) {
+        setError("Could not capture a frame.");
         setScanning(false);
         return;
       }
-      // Capture a frame from the video stream.
-      const canvas = document.createElement('canvas');
-      canvas.width = video.videoWidth;
-      canvas.height = video.videoHeight;
-      const ctx = canvas.getContext('2d');
-      if (!ctx) {
-        setError("Could not get canvas context.");
-        setScanning(false);
-        return;
-      }
-      ctx.drawImage(video, 0, 0, canvas.width, canvas.height);
-      const imageDataUrl = canvas.toDataURL('image/jpeg');
 
-      // Send the image to your Flask API.
-      const response = await fetch('http://127.0.0.1:5000/api/measure', {
+      // Send the JPEG bytes as the raw request body; no base64 or JSON wrapping.
+      const response = await fetch('http://127.0.0.1:5000/api/measure/raw', {
         method: 'POST',
-        headers: { 'Content-Type': 'application/json' },
-        body: JSON.stringify({ image: imageDataUrl })
+        headers: { 'Content-Type': 'image/jpeg', 'X-Session-ID': sessionId() },
+        body: blob
       });
       const data = await response.json();
       if (data.error) {
         setError(data.error);
       } else {
-        // Automatically navigate to the Measurement page with query parameters.
-        router.push(
-          `/measurement?eye_width_mm=${data.eye_width_mm}&bridge_width_mm=${data.bridge_width_mm}&b_size_mm=${data.b_size_mm}`
-        );
+        showMeasurements(data);
       }
     } catch (err: any) {
       setError("An error occurred: " + err.message);
@@ -91,6 +122,70 @@ export default function ScanPage() {
     setScanning(false);
   };
 
+  const startScan = () => {
+    setScanning(true);
+    setError(null);
+    setHint(null);
+    if (!captureCanvas()) {
+      setScanning(false);
+      return;
+    }
+
+    let connected = false;
+    let finished = false;
+    const session = new WebSocket('ws://127.0.0.1:5000/ws/measure');
+    sessionRef.current = session;
+
+    // Only one frame is in flight at a time: the next frame is sent when the server
+    // answers, so the capture rate follows the server's processing rate.
+    const sendFrame = () => {
+      const canvas = captureCanvas();
+      if (!canvas) {
+        finished = true;
+        session.close();
+        setScanning(false);
+        return;
+      }
+      canvas.toBlob((blob) => {
+        if (blob && session.readyState === WebSocket.OPEN) {
+          session.send(blob);
+        }
+      }, 'image/jpeg');
+    };
+
+    session.onopen = () => {
+      connected = true;
+      sendFrame();
+    };
+    session.onmessage = (event) => {
+      const data = JSON.parse(event.data);
+      if (data.type === 'done') {
+        finished = true;
+        setScanning(false);
+        showMeasurements(data);
+      } else if (data.type === 'error') {
+        finished = true;
+        setError(data.message);
+        setScanning(false);
+      } else {
+        setHint(data.type === 'hint' ? data.hint : `Measuring... (${data.samples} frames)`);
+        sendFrame();
+      }
+    };
+    session.onclose = () => {
+      sessionRef.current = null;
+      if (finished) {
+        return;
+      }
+      if (!connected) {
+        measureSingleFrame();
+      } else {
+        setError("Lost connection to the measurement server. Please try again.");
+        setScanning(false);
+      }
+    };
+  };
+
   return (
     <main className="flex flex-col items-center justify-center min-h-screen p-4 relative">
       <h1 className="text-4xl font-bold mb-4">Face Scan</h1>
@@ -116,7 +211,7 @@ export default function ScanPage() {
 
           {scanning ? (
             <div className="text-center text-gray-600 mb-6">
-              <div className="animate-pulse">Scanning in progress...</div>
+              <div className="animate-pulse">{hint ?? "Scanning in progress..."}</div>
             </div>
           ) : error ? (
             <div className="text-center text-red-500 mb-6 bg-red-50 p-4 rounded-lg">
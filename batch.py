@@ -0,0 +1,209 @@
+"""
+Headless batch measurement of recorded fittings.
+
+Each source is one subject: a video file or a directory of images. Sources are
+fanned out across a process pool; every worker streams its subject's frames
+through the measurement pipeline one at a time (see measurement.iter_frames), so
+a video is never held in memory. One JSON line per subject is appended to the
+results file together with the run's metadata, so earlier runs are never
+overwritten:
+
+    python batch.py recordings/ --results results.jsonl
+    python batch.py alice.mp4 bob.mp4 frames/carol --workers 4 --resume
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import platform
+import subprocess
+import time
+import uuid
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import asdict
+from datetime import datetime, timezone
+from functools import partial
+
+from measurement import (
+    CONFIGS,
+    IMAGE_EXTENSIONS,
+    MAX_FRAMES,
+    TOLERANCE_MM,
+    FaceTracker,
+    ScaleCalibration,
+    StreamingEstimator,
+    init_worker,
+    iter_frames,
+    measure,
+    source_config,
+)
+
+VIDEO_EXTENSIONS = ('.mp4', '.mov', '.avi', '.mkv', '.webm')
+RESULTS_PATH = 'measurements.jsonl'
+
+def _has_images(directory):
+    return any(name.lower().endswith(IMAGE_EXTENSIONS) for name in os.listdir(directory))
+
+def discover_sources(paths):
+    """
+    Yields the subjects to measure. A video file or a directory of images is one
+    subject; any other directory contributes the videos and image directories
+    directly inside it, in name order.
+    """
+    for path in paths:
+        if not os.path.isdir(path) or _has_images(path):
+            yield path
+            continue
+        for name in sorted(os.listdir(path)):
+            child = os.path.join(path, name)
+            if os.path.isdir(child) and _has_images(child):
+                yield child
+            elif name.lower().endswith(VIDEO_EXTENSIONS):
+                yield child
+
+def subject_name(source):
+    """The subject a source belongs to: its file or directory name without extension."""
+    return os.path.splitext(os.path.basename(os.path.normpath(source)))[0]
+
+def measure_subject(source, config_name, max_frames=MAX_FRAMES, tolerance_mm=TOLERANCE_MM):
+    """
+    Streams one subject's frames through the pipeline, tracking the face and
+    calibrating the scale across frames like a live scan, until the estimate
+    converges, max_frames frames were measured or the frames run out. Returns
+    the subject's result record.
+    """
+    config = source_config(CONFIGS[config_name], source)
+    tracker = FaceTracker(config.tracker_padding, config.lost_frame_threshold, config.tracker_refresh_interval)
+    calibration = ScaleCalibration(config.calibration_frames, config.recalibration_face_change,
+                                   config.recalibration_scale_change)
+    estimator = StreamingEstimator(capacity=max_frames, tolerance_mm=tolerance_mm)
+    errors = Counter()
+    frames = 0
+    started = time.perf_counter()
+    for _name, _decode_seconds, frame in iter_frames(source):
+        frames += 1
+        result = measure(frame, config, tracker, calibration)
+        if result.error:
+            errors[result.error] += 1
+        else:
+            estimator.add(result.measurement)
+        if estimator.converged() or estimator.frames >= max_frames:
+            break
+    return {
+        'subject': subject_name(source),
+        'source': source,
+        'frames': frames,
+        'accepted': estimator.count,
+        'rejected': estimator.rejected,
+        'reanchors': estimator.reanchors,
+        'converged': estimator.converged(),
+        'recalibrations': calibration.recalibrations,
+        'measurement': estimator.estimate(),
+        'interval_mm': estimator.interval(),
+        'errors': dict(errors),
+        'seconds': round(time.perf_counter() - started, 3),
+    }
+
+def _revision():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True, check=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip() or None
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def run_metadata(config_name, max_frames, tolerance_mm):
+    """Describes this run; stored with every record so results files can be merged and audited."""
+    return {
+        'run_id': uuid.uuid4().hex,
+        'started_at': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        'host': platform.node(),
+        'revision': _revision(),
+        'config': config_name,
+        'max_frames': max_frames,
+        'tolerance_mm': tolerance_mm,
+        'parameters': asdict(CONFIGS[config_name]),
+    }
+
+def completed_sources(results_path):
+    """Sources that already have a successful record in the results file."""
+    done = set()
+    if not os.path.exists(results_path):
+        return done
+    with open(results_path) as file:
+        for line in file:
+            try:
+                record = json.loads(line)
+            except ValueError:
+                continue    # A run killed mid-write can leave a partial last line.
+            if record.get('measurement') is not None:
+                done.add(record['source'])
+    return done
+
+def run_batch(sources, results_path=RESULTS_PATH, workers=None, config_name='webcam',
+              max_frames=MAX_FRAMES, tolerance_mm=TOLERANCE_MM):
+    """
+    Measures every source and appends one record per subject to results_path as
+    soon as it finishes. A subject that fails to open or crashes gets a record
+    with an 'error' instead of a measurement. With workers=0 subjects are
+    measured in this process, one after another. Returns (measured, failed).
+    """
+    metadata = run_metadata(config_name, max_frames, tolerance_mm)
+    args = (config_name, max_frames, tolerance_mm)
+    measured = failed = 0
+    executor = None
+    if workers == 0:
+        results = ((source, partial(measure_subject, source, *args)) for source in sources)
+    else:
+        # Spawned workers start from a clean interpreter, as in the server's frame pool.
+        executor = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context('spawn'),
+                                       initializer=init_worker)
+        futures = {executor.submit(measure_subject, source, *args): source for source in sources}
+        results = ((futures[future], future.result) for future in as_completed(futures))
+    try:
+        with open(results_path, 'a') as file:
+            for source, get_record in results:
+                try:
+                    record = get_record()
+                except Exception as exc:
+                    record = {'subject': subject_name(source), 'source': source, 'measurement': None,
+                              'error': f"{type(exc).__name__}: {exc}"}
+                record = {'run': metadata, 'finished_at': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+                          **record}
+                # One line per write, flushed at once, so an interrupted run keeps every finished subject.
+                file.write(json.dumps(record) + '\n')
+                file.flush()
+                if record['measurement'] is None:
+                    failed += 1
+                else:
+                    measured += 1
+                print(f"{record['subject']}: {record['measurement'] or record.get('error') or 'no stable measurement'}")
+    finally:
+        if executor is not None:
+            executor.shutdown(cancel_futures=True)
+    return measured, failed
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('paths', nargs='+', help="video files, image directories or directories of either")
+    parser.add_argument('--results', default=RESULTS_PATH, help="JSONL file results are appended to")
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1,
+                        help="worker processes; 0 measures in this process")
+    parser.add_argument('--config', choices=sorted(CONFIGS), default='webcam')
+    parser.add_argument('--max-frames', type=int, default=MAX_FRAMES)
+    parser.add_argument('--tolerance-mm', type=float, default=TOLERANCE_MM)
+    parser.add_argument('--resume', action='store_true', help="skip sources already measured in the results file")
+    args = parser.parse_args()
+
+    sources = list(discover_sources(args.paths))
+    if args.resume:
+        done = completed_sources(args.results)
+        sources = [source for source in sources if source not in done]
+    print(f"Measuring {len(sources)} subjects with {args.workers} workers...")
+    started = time.perf_counter()
+    measured, failed = run_batch(sources, args.results, args.workers, args.config, args.max_frames, args.tolerance_mm)
+    print(f"✅ {measured} measured, {failed} without a measurement in {time.perf_counter() - started:.1f} s; "
+          f"results appended to {args.results}")
+
+if __name__ == '__main__':
+    main()
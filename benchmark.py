@@ -0,0 +1,243 @@
+"""
+Offline benchmark and accuracy harness for the measurement engine.
+
+Replays a directory of images or a video file through the pipeline without a
+camera and reports per-stage latency, throughput, detection rate and the spread
+of each dimension against a ground-truth CSV (same format as
+glasses_final_dimensions.csv). A synthetic corpus can be generated so the
+harness runs on a headless box:
+
+    python benchmark.py synth corpus/ --frames 200
+    python benchmark.py run corpus/ --ground-truth corpus/ground_truth.csv
+    python benchmark.py run fitting.mp4 --config webcam --track
+"""
+import argparse
+import csv
+import os
+import time
+from collections import Counter
+
+import cv2
+import numpy as np
+
+from measurement import (CONFIGS, MEASUREMENT_KEYS, STAGES, FaceTracker, compute_dimensions, iter_frames, measure,
+                         source_config)
+
+# Row labels used by glasses_final_dimensions.csv.
+CSV_LABELS = {
+    'Eye Width': 'eye_width_mm',
+    'Bridge Size': 'bridge_width_mm',
+    'B Size (Vertical Height)': 'b_size_mm',
+}
+
+# Proportions of the synthetic face, relative to its interpupillary distance.
+SYNTH_IPD_MM = 63
+SYNTH_IRIS_RADIUS = 0.1
+SYNTH_EYE_HALF_WIDTH = 0.22
+SYNTH_EYE_HALF_HEIGHT = 0.1
+# Side of the square the eye cascade frames around each drawn eye: brow to lower lid, brow end to brow end.
+SYNTH_EYE_REGION = 0.67
+
+def read_ground_truth(path):
+    """Reads a glasses_final_dimensions.csv style file; rows without a number are skipped."""
+    truth = {}
+    with open(path, newline="") as file:
+        for row in csv.reader(file):
+            if len(row) < 2 or row[0] not in CSV_LABELS:
+                continue
+            try:
+                truth[CSV_LABELS[row[0]]] = float(row[1])
+            except ValueError:
+                pass
+    return truth
+
+def write_ground_truth(path, truth):
+    with open(path, mode="w", newline="") as file:
+        writer = csv.writer(file)
+        writer.writerow(["Measurement", "Value (mm)"])
+        for label, key in CSV_LABELS.items():
+            writer.writerow([label, truth[key]])
+
+def synthesize_face(rng, width=1280, height=720, clean=False):
+    """
+    Draws a shaded, cascade-detectable frontal face with random position, size,
+    exposure, noise and blur. A `clean` frame keeps the nominal exposure, has no
+    noise and only the lightest blur (as from any lens; a perfectly sharp,
+    aliased iris scatters the Hough gradient votes). The proportions are fixed,
+    so every frame has the same dimensions in millimetres (see
+    synthetic_ground_truth).
+    """
+    ipd = rng.uniform(0.19, 0.24) * height
+    cx = width / 2 + rng.uniform(-0.04, 0.04) * width
+    cy = height / 2 + rng.uniform(-0.04, 0.04) * height
+    yy, xx = np.mgrid[0:height, 0:width].astype(np.float32)
+
+    img = np.full((height, width), 90, np.float32)
+    # Face: an ellipse brighter in the middle than at its edges.
+    r = ((xx - cx) / (ipd * 1.1)) ** 2 + ((yy - cy - ipd * 0.1) / (ipd * 1.5)) ** 2
+    inside = r < 1
+    img[inside] = 110 + 110 * np.sqrt(1 - r[inside])
+
+    for side in (-1, 1):
+        ex, ey = cx + side * ipd / 2, cy - ipd * 0.25
+        # Eye socket shadow, eye white, iris and brow. The iris is one dark disc: a
+        # darker concentric pupil splits the Hough radius votes and the iris is missed.
+        socket = ((xx - ex) / (ipd * 0.38)) ** 2 + ((yy - ey) / (ipd * 0.2)) ** 2
+        img -= 90 * np.exp(-socket * 1.5)
+        center = (int(round(ex)), int(round(ey)))
+        cv2.ellipse(img, center, (int(ipd * SYNTH_EYE_HALF_WIDTH), int(ipd * SYNTH_EYE_HALF_HEIGHT)),
+                    0, 0, 360, 200, -1)
+        cv2.circle(img, center, int(ipd * SYNTH_IRIS_RADIUS), 60, -1)
+        cv2.ellipse(img, (center[0], int(ey - ipd * 0.22)), (int(ipd * 0.28), int(ipd * 0.06)),
+                    0, 180, 360, 40, max(2, int(ipd * 0.07)))
+    # No nostrils: the eye cascade takes them for a third, tiny eye between the real ones.
+    mouth = ((xx - cx) / (ipd * 0.4)) ** 2 + ((yy - cy - ipd * 0.72) / (ipd * 0.1)) ** 2
+    img -= 80 * np.exp(-mouth * 2)
+
+    if not clean:
+        img = img * rng.uniform(0.7, 1.2) + rng.normal(0, rng.uniform(0, 6), img.shape)
+    img = np.clip(img, 0, 255).astype(np.uint8)
+    blur = 3 if clean else int(rng.choice([3, 5, 7, 9]))
+    img = cv2.GaussianBlur(img, (blur, blur), 0)
+    return cv2.cvtColor(img, cv2.COLOR_GRAY2BGR)
+
+def synthetic_ground_truth(ipd=1000):
+    """
+    The dimensions of the synthetic face, computed the way the pipeline measures
+    a frame (compute_dimensions, scaled by the interpupillary distance) from the
+    geometry synthesize_face draws: an eye region around each eye and an iris
+    centred in it. `ipd` is the drawing scale in pixels; the result does not
+    depend on it beyond rounding.
+    """
+    box = int(round(ipd * SYNTH_EYE_REGION))
+    radius = ipd * SYNTH_IRIS_RADIUS
+    left_eye = (0, 0, box, box)
+    right_eye = (ipd, 0, box, box)
+    iris = {'iris': (box / 2 - radius, box / 2 + radius), 'pupil': (box / 2, box / 2)}
+    return compute_dimensions(left_eye, right_eye, iris, iris, SYNTH_IPD_MM)
+
+SYNTH_GROUND_TRUTH = synthetic_ground_truth()
+
+def generate_corpus(out_dir, frames, width, height, seed=0):
+    """Writes synthetic JPEG frames and their ground_truth.csv into out_dir."""
+    os.makedirs(out_dir, exist_ok=True)
+    rng = np.random.default_rng(seed)
+    for index in range(frames):
+        frame = synthesize_face(rng, width, height)
+        cv2.imwrite(os.path.join(out_dir, f"frame_{index:05d}.jpg"), frame)
+    write_ground_truth(os.path.join(out_dir, "ground_truth.csv"), SYNTH_GROUND_TRUTH)
+
+def run_benchmark(source, config, track=False, ground_truth=None):
+    """
+    Measures every frame of `source` and returns a report dict with latency
+    percentiles per stage (ms), throughput, detection rate, error counts and
+    per-dimension statistics (against `ground_truth` when given).
+    """
+    config = source_config(config, source)
+    stage_times = {stage: [] for stage in ('decode',) + STAGES + ('total',)}
+    errors = Counter()
+    measurements = []
+    tracker = None
+    if track:
+        tracker = FaceTracker(config.tracker_padding, config.lost_frame_threshold, config.tracker_refresh_interval)
+    frames = 0
+    wall_started = time.perf_counter()
+
+    for _name, decode_seconds, frame in iter_frames(source):
+        frames += 1
+        started = time.perf_counter()
+        result = measure(frame, config, tracker)
+        total = decode_seconds + time.perf_counter() - started
+        stage_times['decode'].append(decode_seconds)
+        for stage, seconds in result.timings.items():
+            stage_times[stage].append(seconds)
+        stage_times['total'].append(total)
+        if result.error:
+            errors[result.error] += 1
+        else:
+            measurements.append(result.measurement)
+
+    wall_seconds = time.perf_counter() - wall_started
+    processing_seconds = sum(stage_times['total'])
+    report = {
+        'source': source,
+        'frames': frames,
+        'measured': len(measurements),
+        'success_rate': len(measurements) / frames if frames else 0.0,
+        'fps': frames / processing_seconds if processing_seconds else 0.0,
+        'wall_seconds': wall_seconds,
+        'errors': dict(errors),
+        'latency_ms': {},
+        'dimensions': {},
+    }
+    for stage, samples in stage_times.items():
+        if samples:
+            ms = np.array(samples) * 1000
+            report['latency_ms'][stage] = {
+                'count': len(ms),
+                'mean': float(ms.mean()),
+                'p50': float(np.percentile(ms, 50)),
+                'p90': float(np.percentile(ms, 90)),
+                'p99': float(np.percentile(ms, 99)),
+            }
+    for key in MEASUREMENT_KEYS:
+        if not measurements:
+            break
+        values = np.array([m[key] for m in measurements], dtype=float)
+        stats = {'mean': float(values.mean()), 'std': float(values.std())}
+        if ground_truth and key in ground_truth:
+            error = values - ground_truth[key]
+            stats.update(truth=ground_truth[key], bias=float(error.mean()),
+                         rmse=float(np.sqrt(np.mean(error ** 2))))
+        report['dimensions'][key] = stats
+    return report
+
+def print_report(report):
+    print(f"Source: {report['source']}")
+    print(f"Frames: {report['frames']}  measured: {report['measured']} "
+          f"({report['success_rate']:.1%})  throughput: {report['fps']:.1f} frames/s")
+    print()
+    print(f"{'stage':<14}{'count':>7}{'mean':>9}{'p50':>9}{'p90':>9}{'p99':>9}   (ms)")
+    for stage, stats in report['latency_ms'].items():
+        print(f"{stage:<14}{stats['count']:>7}{stats['mean']:>9.2f}{stats['p50']:>9.2f}"
+              f"{stats['p90']:>9.2f}{stats['p99']:>9.2f}")
+    if report['dimensions']:
+        print()
+        print(f"{'dimension':<18}{'mean':>9}{'std':>9}{'truth':>9}{'bias':>9}{'rmse':>9}   (mm)")
+        for key, stats in report['dimensions'].items():
+            row = f"{key:<18}{stats['mean']:>9.2f}{stats['std']:>9.2f}"
+            if 'truth' in stats:
+                row += f"{stats['truth']:>9.2f}{stats['bias']:>9.2f}{stats['rmse']:>9.2f}"
+            print(row)
+    if report['errors']:
+        print()
+        for error, count in sorted(report['errors'].items(), key=lambda item: -item[1]):
+            print(f"{count:>7}  {error}")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    synth = commands.add_parser('synth', help="generate a synthetic frame corpus")
+    synth.add_argument('out_dir')
+    synth.add_argument('--frames', type=int, default=200)
+    synth.add_argument('--width', type=int, default=1280)
+    synth.add_argument('--height', type=int, default=720)
+    synth.add_argument('--seed', type=int, default=0)
+
+    run = commands.add_parser('run', help="replay a frame directory or video through the pipeline")
+    run.add_argument('source', help="directory of images or a video file")
+    run.add_argument('--ground-truth', help="CSV in the glasses_final_dimensions.csv format")
+    run.add_argument('--config', choices=sorted(CONFIGS), default='server')
+    run.add_argument('--track', action='store_true', help="track the face across frames like a live session")
+
+    args = parser.parse_args()
+    if args.command == 'synth':
+        generate_corpus(args.out_dir, args.frames, args.width, args.height, args.seed)
+        print(f"Wrote {args.frames} frames and ground_truth.csv to {args.out_dir}")
+    else:
+        ground_truth = read_ground_truth(args.ground_truth) if args.ground_truth else None
+        print_report(run_benchmark(args.source, CONFIGS[args.config], args.track, ground_truth))
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,157 @@
+"""
+Threaded capture and detection stages for the webcam tool (main.py).
+
+A capture thread keeps only the newest camera frame, so detection never works
+on stale buffered frames. One or more detection threads measure those frames
+(OpenCV releases the GIL) and hand the results to the caller through a
+bounded queue, so the render loop no longer adds to measurement latency.
+"""
+import queue
+import threading
+import time
+
+import cv2
+
+from measurement import FaceTracker, ScaleCalibration, measure
+
+MAX_FAILED_READS = 30       # Consecutive failed reads after which the camera is considered gone.
+FAILED_READ_DELAY_S = 0.01  # Pause before retrying a failed read.
+
+
+class LatestFrameReader:
+    """
+    Reads a cv2.VideoCapture on a background thread, keeping only the latest frame.
+    A failed read is retried; the reader stops after `max_failed_reads` in a row.
+    """
+
+    def __init__(self, cap, max_failed_reads=MAX_FAILED_READS):
+        self.cap = cap
+        self.max_failed_reads = max_failed_reads
+        self.frames_read = 0
+        self.frames_dropped = 0
+        self.failed_reads = 0
+        self._frame = None
+        self._index = 0
+        self._stopped = False
+        self._condition = threading.Condition()
+        self._thread = threading.Thread(target=self._run, name='capture', daemon=True)
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def _run(self):
+        failed = 0
+        while not self._stopped:
+            ret, frame = self.cap.read()
+            if not ret:
+                failed += 1
+                self.failed_reads += 1
+                print("Failed to grab frame")
+                if failed >= self.max_failed_reads:
+                    # A camera that stops delivering frames ends the pipeline.
+                    self.stop()
+                    return
+                time.sleep(FAILED_READ_DELAY_S)
+                continue
+            failed = 0
+            with self._condition:
+                if self._frame is not None:
+                    self.frames_dropped += 1
+                self._frame = frame
+                self._index += 1
+                self.frames_read += 1
+                self._condition.notify()
+
+    def read(self, timeout=1.0):
+        """
+        Waits for a frame that has not been handed out yet and returns
+        (index, frame), or None once the reader is stopped.
+        """
+        with self._condition:
+            while self._frame is None and not self._stopped:
+                self._condition.wait(timeout)
+            if self._stopped:
+                return None
+            frame, self._frame = self._frame, None
+            return self._index, frame
+
+    def stop(self):
+        """
+        Stops reading and waits for the reader thread to return from cap.read(),
+        so the capture can be released safely afterwards.
+        """
+        with self._condition:
+            self._stopped = True
+            self._condition.notify_all()
+        # The reader stops itself when the camera fails; it cannot wait for its own thread.
+        if self._thread.is_alive() and threading.current_thread() is not self._thread:
+            self._thread.join()
+
+
+class DetectionPipeline:
+    """
+    Capture thread plus `workers` detection threads. Each worker keeps its own
+    FaceTracker and ScaleCalibration. Results arrive on `results` as (index, frame, MeasurementResult)
+    tuples, in completion order; the queue is bounded, so a stalled consumer
+    pauses detection instead of growing memory.
+    """
+
+    def __init__(self, cap, config, workers=1, lost_frame_threshold=10, queue_size=8, flip=True):
+        self.config = config
+        self.flip = flip
+        self.lost_frame_threshold = lost_frame_threshold
+        self.reader = LatestFrameReader(cap)
+        self.results = queue.Queue(maxsize=queue_size)
+        self.frames_measured = 0
+        self._lock = threading.Lock()
+        self._stopped = threading.Event()
+        self._workers = [threading.Thread(target=self._detect, name=f'detect-{i}', daemon=True)
+                         for i in range(workers)]
+        self._started_at = None
+
+    def start(self):
+        self._started_at = time.perf_counter()
+        self.reader.start()
+        for worker in self._workers:
+            worker.start()
+        return self
+
+    def _detect(self):
+        tracker = FaceTracker(self.config.tracker_padding, self.lost_frame_threshold,
+                              self.config.tracker_refresh_interval)
+        calibration = ScaleCalibration(self.config.calibration_frames, self.config.recalibration_face_change,
+                                       self.config.recalibration_scale_change)
+        while not self._stopped.is_set():
+            item = self.reader.read()
+            if item is None:
+                break
+            index, frame = item
+            if self.flip:
+                frame = cv2.flip(frame, 1)
+            result = measure(frame, self.config, tracker, calibration)
+            with self._lock:
+                self.frames_measured += 1
+            while not self._stopped.is_set():
+                try:
+                    self.results.put((index, frame, result), timeout=0.1)
+                    break
+                except queue.Full:
+                    continue
+        self._stopped.set()
+
+    @property
+    def running(self):
+        return not self._stopped.is_set()
+
+    def fps(self):
+        """Frames measured per second since start()."""
+        elapsed = time.perf_counter() - self._started_at if self._started_at else 0
+        return self.frames_measured / elapsed if elapsed else 0.0
+
+    def stop(self):
+        """Stops capture and detection. Once it returns, the capture is no longer read and may be released."""
+        self._stopped.set()
+        self.reader.stop()
+        for worker in self._workers:
+            worker.join(timeout=2)
@@ -1,14 +1,65 @@
 'use client';
 import { useFrame } from "@react-three/fiber";
-import { useEffect, useRef } from "react";
+import { Component, ReactNode, useEffect, useRef } from "react";
 import { OBJLoader } from 'three/examples/jsm/loaders/OBJLoader'
 import { useLoader } from '@react-three/fiber'
 import { Object3D } from "three";
+import { MeshBinaryLoader } from "@/lib/meshBinary";
 
+// Fitted frames are fetched in the compact binary format; see mesh/binary.py.
+const MODEL_ENDPOINT = 'http://127.0.0.1:5000/api/frames/model.bin';
+// Unfitted template, shown when no fitted model can be loaded.
+const STATIC_MODEL_URL = '/model.obj';
 
-export default function GlassesModel() {
+export type FrameDimensions = {
+    eyeWidth: string;
+    bridgeWidth: string;
+    bSize: string;
+};
+
+// URL of the frame template fitted to the given measurements by the local mesh generator.
+// These are the scan's own values; the server maps the eye width to a lens width.
+export function fittedModelUrl({ eyeWidth, bridgeWidth, bSize }: FrameDimensions) {
+    const params = new URLSearchParams({
+        eye_width_mm: eyeWidth,
+        bridge_width_mm: bridgeWidth,
+        b_size_mm: bSize,
+    });
+    return `${MODEL_ENDPOINT}?${params.toString()}`;
+}
+
+// Renders `fallback` instead of its children once they throw, e.g. when a model fails to load.
+class ModelErrorBoundary extends Component<{ fallback: ReactNode; children: ReactNode }, { failed: boolean }> {
+    state = { failed: false };
+
+    static getDerivedStateFromError() {
+        return { failed: true };
+    }
+
+    componentDidCatch(error: unknown) {
+        console.warn('Could not load the fitted frame model; showing the template instead.', error);
+    }
+
+    render() {
+        return this.state.failed ? this.props.fallback : this.props.children;
+    }
+}
+
+export default function GlassesModel({ url = STATIC_MODEL_URL }: { url?: string }) {
+    if (url === STATIC_MODEL_URL) {
+        return <LoadedModel url={url} />;
+    }
+    return (
+        <ModelErrorBoundary key={url} fallback={<LoadedModel url={STATIC_MODEL_URL} />}>
+            <LoadedModel url={url} />
+        </ModelErrorBoundary>
+    );
+}
+
+function LoadedModel({ url }: { url: string }) {
     const ref = useRef<Object3D>(null);
-    const obj = useLoader(OBJLoader, '/model.obj');
+    const isBinary = url.split('?')[0].endsWith('.bin');
+    const obj = useLoader(isBinary ? MeshBinaryLoader : OBJLoader, url);
     const mouse = useRef({ x: 0, y: 0 });
 
     useEffect(() => {
@@ -32,4 +83,4 @@ export default function GlassesModel() {
     return (
         <primitive ref={ref} object={obj} position={[.045, -.17, 0]} />
     );
-}
\ No newline at end of file
+}
@@ -0,0 +1,105 @@
+import threading
+import time
+from collections import OrderedDict
+
+import cv2
+import numpy as np
+
+HASH_SIZE = 8   # dHash grid: 8x8 horizontal gradients, 64 bits.
+
+def dhash(gray):
+    """
+    Difference hash of a grayscale image: one bit per horizontal brightness
+    gradient on a 9x8 thumbnail. Near-identical frames differ in few bits.
+    """
+    thumb = cv2.resize(gray, (HASH_SIZE + 1, HASH_SIZE), interpolation=cv2.INTER_AREA)
+    bits = (thumb[:, 1:] > thumb[:, :-1]).ravel()
+    return int(np.packbits(bits).view('>u8')[0])
+
+def encoded_frame_hash(encoded):
+    """
+    dHash of an encoded image, decoded at 1/8 scale in grayscale (JPEG scales
+    during decoding, so this is far cheaper than a full decode).
+    Returns None if the image cannot be decoded.
+    """
+    gray = cv2.imdecode(np.frombuffer(encoded, np.uint8), cv2.IMREAD_REDUCED_GRAYSCALE_8) if encoded else None
+    return None if gray is None else dhash(gray)
+
+
+class FrameCache:
+    """
+    Bounded cache of frame results per session, keyed by frame dHash.
+
+    lookup() returns the result stored for a frame of the same session whose hash
+    is within `max_distance` bits, so a user holding still or retrying does not
+    rerun the pipeline. Entries expire after `ttl_s`; each session keeps its
+    `entries_per_session` most recent frames and the least recently used
+    sessions are dropped beyond `max_sessions`.
+    """
+
+    def __init__(self, max_sessions=1024, entries_per_session=16, ttl_s=10.0, max_distance=4):
+        self.max_sessions = max_sessions
+        self.entries_per_session = entries_per_session
+        self.ttl_s = ttl_s
+        self.max_distance = max_distance
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._sessions = OrderedDict()
+        self._lock = threading.Lock()
+
+    def lookup(self, session_id, frame_hash):
+        now = time.monotonic()
+        with self._lock:
+            entries = self._sessions.get(session_id)
+            if entries is not None:
+                self._sessions.move_to_end(session_id)
+                self._expire(entries, now)
+                for stored_hash, (value, _) in reversed(entries.items()):
+                    if bin(stored_hash ^ frame_hash).count('1') <= self.max_distance:
+                        entries.move_to_end(stored_hash)
+                        self.hits += 1
+                        return value
+            self.misses += 1
+            return None
+
+    def store(self, session_id, frame_hash, value):
+        now = time.monotonic()
+        with self._lock:
+            entries = self._sessions.get(session_id)
+            if entries is None:
+                entries = self._sessions[session_id] = OrderedDict()
+            self._sessions.move_to_end(session_id)
+            entries[frame_hash] = (value, now + self.ttl_s)
+            entries.move_to_end(frame_hash)
+            while len(entries) > self.entries_per_session:
+                entries.popitem(last=False)
+                self.evictions += 1
+            while len(self._sessions) > self.max_sessions:
+                _, dropped = self._sessions.popitem(last=False)
+                self.evictions += len(dropped)
+
+    def _expire(self, entries, now):
+        for stored_hash in [h for h, (_, expires) in entries.items() if expires <= now]:
+            del entries[stored_hash]
+            self.evictions += 1
+
+    def discard(self, session_id):
+        """Forgets a finished session."""
+        with self._lock:
+            self._sessions.pop(session_id, None)
+
+    def __len__(self):
+        with self._lock:
+            return sum(len(entries) for entries in self._sessions.values())
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / lookups if lookups else 0.0,
+                'evictions': self.evictions,
+                'sessions': len(self._sessions),
+            }
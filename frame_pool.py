@@ -0,0 +1,138 @@
+import multiprocessing
+import threading
+import time
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from concurrent.futures.process import BrokenProcessPool
+from functools import partial
+
+
+class PoolBusyError(Exception):
+    """Raised when every worker is busy and the waiting queue is already full."""
+
+
+class PoolTimeoutError(Exception):
+    """Raised when a frame is not processed before its request deadline."""
+
+
+class PoolBrokenError(Exception):
+    """Raised when a worker process died and broke the pool; the next submission starts a fresh one."""
+
+
+class FramePool:
+    """
+    Bounded process pool for CPU-heavy frame processing.
+
+    At most `workers + max_queued` frames are accepted at once; further submissions
+    fail immediately with PoolBusyError so the caller can shed load instead of
+    queueing without limit. With `workers=0` frames are processed inline, which is
+    handy for debugging.
+    """
+
+    def __init__(self, workers, max_queued, timeout_s, initializer=None):
+        self.workers = workers
+        self.timeout_s = timeout_s
+        self.initializer = initializer
+        self._slots = threading.BoundedSemaphore(workers + max_queued) if workers else None
+        self._executor = None
+        self._lock = threading.Lock()
+
+    def _get_executor(self):
+        with self._lock:
+            if self._executor is None:
+                # Spawned workers start from a clean interpreter, so forking a
+                # multithreaded server process cannot leave locks held in a child.
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    mp_context=multiprocessing.get_context('spawn'),
+                    initializer=self.initializer
+                )
+            return self._executor
+
+    def _reset_executor(self, broken):
+        with self._lock:
+            if self._executor is broken:
+                self._executor = None
+        broken.shutdown(wait=False, cancel_futures=True)
+
+    def _acquire(self, count):
+        acquired = 0
+        while acquired < count:
+            if not self._slots.acquire(blocking=False):
+                for _ in range(acquired):
+                    self._slots.release()
+                raise PoolBusyError()
+            acquired += 1
+
+    def _release(self, _future=None):
+        self._slots.release()
+
+    def _reset_if_broken(self, executor, future):
+        # A worker died (e.g. OpenCV crashed on a bad frame) and every pending call
+        # failed with it; the executor cannot run anything else, so start a fresh pool.
+        if not future.cancelled() and isinstance(future.exception(), BrokenProcessPool):
+            self._reset_executor(executor)
+
+    def submit_many(self, fn, args_list):
+        """
+        Submits fn(*args) for every entry of args_list and returns the futures.
+        Either all calls are accepted or PoolBusyError is raised and none are.
+        Raises PoolBrokenError if the pool broke before every call was submitted.
+        """
+        if not self.workers:
+            futures = []
+            for args in args_list:
+                future = Future()
+                try:
+                    future.set_result(fn(*args))
+                except Exception as exc:
+                    future.set_exception(exc)
+                futures.append(future)
+            return futures
+
+        self._acquire(len(args_list))
+        for attempt in range(2):
+            executor = self._get_executor()
+            futures = []
+            try:
+                for args in args_list:
+                    future = executor.submit(fn, *args)
+                    future.add_done_callback(self._release)
+                    future.add_done_callback(partial(self._reset_if_broken, executor))
+                    futures.append(future)
+                return futures
+            except BrokenProcessPool as exc:
+                self._reset_executor(executor)
+                if futures or attempt:
+                    for _ in range(len(args_list) - len(futures)):
+                        self._slots.release()
+                    raise PoolBrokenError() from exc
+                # The pool broke on an earlier call and nothing reached it yet: retry on a fresh one.
+
+    def submit(self, fn, *args):
+        """Submits a single call; see submit_many."""
+        return self.submit_many(fn, [args])[0]
+
+    def deadline(self):
+        """Returns the monotonic deadline for a request starting now."""
+        return time.monotonic() + self.timeout_s
+
+    def result(self, future, deadline):
+        """
+        Waits for a future until the given deadline.
+        Raises PoolTimeoutError (and cancels the call if it has not started yet) on expiry,
+        and PoolBrokenError if a worker died while the call was pending.
+        """
+        try:
+            return future.result(timeout=max(0.0, deadline - time.monotonic()))
+        except FutureTimeoutError:
+            future.cancel()
+            raise PoolTimeoutError()
+        except BrokenProcessPool as exc:
+            raise PoolBrokenError() from exc
+
+    def shutdown(self):
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
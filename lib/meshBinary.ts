@@ -0,0 +1,78 @@
+import {
+  BufferAttribute,
+  BufferGeometry,
+  FileLoader,
+  Group,
+  Loader,
+  Mesh,
+  MeshPhongMaterial,
+} from "three"
+
+// Reader for the quantized binary meshes served by /api/frames/model.bin (see mesh/binary.py).
+const MAGIC = "TSMB"
+const VERSION = 1
+const FLAG_UINT32_INDICES = 1
+const HEADER_BYTES = 40
+
+export function parseMeshBinary(buffer: ArrayBuffer): Group {
+  const view = new DataView(buffer)
+  const magic = String.fromCharCode(...new Uint8Array(buffer, 0, 4))
+  if (magic !== MAGIC || view.getUint16(4, true) !== VERSION) {
+    throw new Error("Not a version 1 TSMB mesh")
+  }
+  const flags = view.getUint16(6, true)
+  const vertexCount = view.getUint32(8, true)
+  const indexCount = view.getUint32(12, true)
+  const min = [0, 1, 2].map((i) => view.getFloat32(16 + i * 4, true))
+  const max = [0, 1, 2].map((i) => view.getFloat32(28 + i * 4, true))
+
+  // Typed-array views straight onto the response; nothing is copied or parsed.
+  const positions = new Uint16Array(buffer, HEADER_BYTES, vertexCount * 3)
+  const indexOffset = HEADER_BYTES + Math.ceil((vertexCount * 6) / 4) * 4
+  const indices = flags & FLAG_UINT32_INDICES
+    ? new Uint32Array(buffer, indexOffset, indexCount)
+    : new Uint16Array(buffer, indexOffset, indexCount)
+
+  const geometry = new BufferGeometry()
+  // Normalized attributes read as 0..1; the mesh transform maps that box onto the bounds.
+  geometry.setAttribute("position", new BufferAttribute(positions, 3, true))
+  geometry.setIndex(new BufferAttribute(indices, 1))
+
+  // Flat shading, like OBJLoader uses for this export; it needs no normals.
+  const mesh = new Mesh(geometry, new MeshPhongMaterial({ flatShading: true }))
+  mesh.position.set(min[0], min[1], min[2])
+  mesh.scale.set(max[0] - min[0] || 1, max[1] - min[1] || 1, max[2] - min[2] || 1)
+
+  const group = new Group()
+  group.add(mesh)
+  return group
+}
+
+export class MeshBinaryLoader extends Loader<Group> {
+  load(
+    url: string,
+    onLoad: (group: Group) => void,
+    onProgress?: (event: ProgressEvent) => void,
+    onError?: (error: unknown) => void,
+  ) {
+    const loader = new FileLoader(this.manager)
+    loader.setPath(this.path)
+    loader.setResponseType("arraybuffer")
+    loader.setRequestHeader(this.requestHeader)
+    loader.setWithCredentials(this.withCredentials)
+    loader.load(
+      url,
+      (buffer) => {
+        try {
+          onLoad(parseMeshBinary(buffer as ArrayBuffer))
+        } catch (error) {
+          if (onError) onError(error)
+          else console.error(error)
+          this.manager.itemError(url)
+        }
+      },
+      onProgress,
+      onError,
+    )
+  }
+}
@@ -0,0 +1,41 @@
+"""
+Face measurement engine shared by the webcam tool (main.py) and the Flask
+service (app.py), and the frame sources and worker initializer of the offline
+tools. Haar cascades are loaded lazily into a per-process pool that measuring
+threads borrow from.
+"""
+from .calibration import CalibrationStore, ScaleCalibration
+from .cascades import borrowed_cascades, get_cascade, preload
+from .config import CONFIGS, SERVER_CONFIG, WEBCAM_CONFIG, MeasurementConfig
+from .engine import (
+    ALIGNMENT_HINTS,
+    ERROR_BLURRY,
+    ERROR_INVALID_IMAGE,
+    ERROR_MOTION,
+    ERROR_NO_EYES,
+    ERROR_NO_FACE,
+    ERROR_NOT_CENTERED,
+    ERROR_OVEREXPOSED,
+    ERROR_TOO_DARK,
+    QUALITY_ERRORS,
+    STAGES,
+    MeasurementResult,
+    measure,
+)
+from .estimator import (
+    EAR_OFFSET_KEYS,
+    MAX_FRAMES,
+    MEASUREMENT_KEYS,
+    MIN_FRAMES,
+    SCALE_KEY,
+    TOLERANCE_MM,
+    StreamingEstimator,
+    aggregate_measurements,
+)
+from .eyes import analyze_eye, detect_iris_boundaries, detect_pupil_center
+from .ears import detect_ears, ear_windows
+from .geometry import compute_dimensions, compute_ear_offsets, is_face_centered
+from .quality import check_quality, quality_thumbnail
+from .sessions import SessionStore
+from .sources import IMAGE_EXTENSIONS, init_worker, iter_frames, source_config
+from .tracking import FaceTracker
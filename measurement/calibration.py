@@ -0,0 +1,96 @@
+from collections import deque
+
+import numpy as np
+
+from .sessions import SessionStore
+
+
+class ScaleCalibration:
+    """
+    Pixel scale of one session (one camera, one face at a roughly fixed distance).
+
+    The scale of each frame comes from the interpupillary distance, which jitters
+    from frame to frame (and falls back to the eye boxes when an iris is missed).
+    The session scale is the median of the first `frames` per-frame scales;
+    later frames reuse it. Each frame's own scale is still checked against it:
+    once the median of the last `frames` per-frame scales is more than
+    `max_scale_change` away (the user leaned in or back a little), the session
+    scale moves to that median. A face box width more than `max_face_change`
+    away from its width during calibration (the user moved a lot, or someone
+    else sat down) starts a new calibration. Like FaceTracker, an instance holds
+    the state of one stream and is not shared between threads.
+    """
+
+    def __init__(self, frames=5, max_face_change=0.1, max_scale_change=0.015):
+        self.frames = frames
+        self.max_face_change = max_face_change
+        self.max_scale_change = max_scale_change
+        self.mm_per_pixel = None    # Session scale, once calibrated.
+        self.face_width = None      # Face box width (pixels) the scale was calibrated at.
+        self.recalibrations = 0
+        self._samples = []          # (face width, mm per pixel) of the frames since the last reset.
+        self._recent = deque(maxlen=frames)     # Per-frame scales since calibrating, to catch drift.
+
+    @property
+    def calibrated(self):
+        return self.mm_per_pixel is not None
+
+    def reset(self):
+        self.mm_per_pixel = None
+        self.face_width = None
+        self._samples = []
+        self._recent.clear()
+
+    def _changed(self, face_width, reference):
+        return abs(face_width - reference) > self.max_face_change * reference
+
+    def scale(self, face_width, frame_scale):
+        """
+        Returns the session's millimetres per pixel for a frame whose face box is
+        `face_width` pixels wide and whose own interpupillary scale is
+        `frame_scale`, or None while it is not calibrated. A face whose size
+        changed too much starts a new calibration.
+        """
+        if self.mm_per_pixel is None:
+            return None
+        if self._changed(face_width, self.face_width):
+            self.reset()
+            self.recalibrations += 1
+            return None
+        self._recent.append(frame_scale)
+        if len(self._recent) == self.frames:
+            recent = float(np.median(self._recent))
+            if abs(recent - self.mm_per_pixel) > self.max_scale_change * self.mm_per_pixel:
+                self.mm_per_pixel = recent
+                self.face_width = face_width
+                self._recent.clear()
+                self.recalibrations += 1
+        return self.mm_per_pixel
+
+    def add(self, face_width, mm_per_pixel):
+        """Adds one frame's own scale estimate while calibrating."""
+        if self._samples and self._changed(face_width, float(np.median([w for w, _ in self._samples]))):
+            # The face moved during calibration; only frames at the new distance count.
+            self._samples = []
+        self._samples.append((face_width, mm_per_pixel))
+        if len(self._samples) >= self.frames:
+            widths, scales = np.array(self._samples).T
+            self.face_width = float(np.median(widths))
+            self.mm_per_pixel = float(np.median(scales))
+            self._samples = []
+
+
+class CalibrationStore(SessionStore):
+    """
+    ScaleCalibrations of the server's sessions (see SessionStore); an unknown
+    or expired session gets a new calibration.
+    """
+
+    def __init__(self, frames=5, max_face_change=0.1, max_scale_change=0.015, max_sessions=1024, ttl_s=600.0):
+        super().__init__(max_sessions, ttl_s)
+        self.frames = frames
+        self.max_face_change = max_face_change
+        self.max_scale_change = max_scale_change
+
+    def default(self):
+        return ScaleCalibration(self.frames, self.max_face_change, self.max_scale_change)
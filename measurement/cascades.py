@@ -0,0 +1,71 @@
+import os
+import threading
+from contextlib import contextmanager
+
+import cv2
+
+FACE_CASCADE = 'haarcascade_frontalface_default.xml'
+EYE_CASCADE = 'haarcascade_eye.xml'
+LEFT_EAR_CASCADE = 'haarcascade_mcs_leftear.xml'
+RIGHT_EAR_CASCADE = 'haarcascade_mcs_rightear.xml'
+# Mirrored and unmirrored frames put each ear on opposite sides of the image, so both are tried on either side.
+EAR_CASCADES = (LEFT_EAR_CASCADE, RIGHT_EAR_CASCADE)
+
+# Cascades shipped with this repository (e.g. the ear cascades) live at its root.
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# A CascadeClassifier must not be used by two threads at once, so each thread
+# borrows a set of cascades from a per-process pool while it measures. Threads
+# that only live for one request (Werkzeug's) reuse the sets loaded before them.
+_free_sets = []
+_free_sets_lock = threading.Lock()
+_local = threading.local()
+
+@contextmanager
+def borrowed_cascades():
+    """
+    Lends this thread a set of cascades from the process's pool for the duration
+    of the block; get_cascade() then returns cascades of that set. A set is only
+    created when every existing one is in use. Nested blocks keep the outer set.
+    """
+    if getattr(_local, 'borrowed', None) is not None:
+        yield
+        return
+    with _free_sets_lock:
+        cascades = _free_sets.pop() if _free_sets else {}
+    _local.borrowed = cascades
+    try:
+        yield
+    finally:
+        _local.borrowed = None
+        with _free_sets_lock:
+            _free_sets.append(cascades)
+
+def get_cascade(filename):
+    """
+    Returns the named Haar cascade from the set borrowed by this thread (see
+    borrowed_cascades), or from the thread's own set outside such a block,
+    loading it on first use. Looks in the repository root first, then in
+    OpenCV's bundled cascades.
+    """
+    cascades = getattr(_local, 'borrowed', None)
+    if cascades is None:
+        cascades = _local.__dict__.setdefault('cascades', {})
+    if filename not in cascades:
+        cascades[filename] = _load_cascade(filename)
+    return cascades[filename]
+
+def _load_cascade(filename):
+    path = os.path.join(REPO_DIR, filename)
+    if not os.path.exists(path):
+        path = os.path.join(cv2.data.haarcascades, filename)
+    cascade = cv2.CascadeClassifier(path)
+    if cascade.empty():
+        raise IOError(f"Could not load Haar cascade {filename}")
+    return cascade
+
+def preload():
+    """Loads a set of the cascades the engine needs into the pool up front, e.g. in a worker initializer."""
+    with borrowed_cascades():
+        get_cascade(FACE_CASCADE)
+        get_cascade(EYE_CASCADE)
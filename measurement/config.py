@@ -0,0 +1,50 @@
+from dataclasses import dataclass
+from typing import Optional
+
+
+@dataclass(frozen=True)
+class MeasurementConfig:
+    """
+    Tunable parameters of the measurement engine.
+    Sizes are in pixels of the full-resolution frame.
+    """
+    known_distance_mm: float = 63          # Assumed interpupillary distance used to recover scale.
+    face_scale_factor: float = 1.1
+    face_min_neighbors: int = 4
+    face_min_size: int = 50
+    eye_scale_factor: float = 1.1
+    eye_min_neighbors: int = 3
+    eye_min_size: int = 20
+    detection_width: Optional[int] = 640   # Faces are searched on a copy this wide; None disables it.
+    tracker_padding: float = 0.6           # Search window padding around the tracked face/eyes.
+    lost_frame_threshold: int = 10         # Missed frames before the tracker searches the whole frame.
+    tracker_refresh_interval: int = 30     # Tracked frames between full face and eye searches.
+    measure_ear_offsets: bool = True       # Detect the ears beside the face and measure the eye-to-ear offsets.
+    ear_scale_factor: float = 1.1
+    ear_min_neighbors: int = 3
+    ear_window: float = 0.4                # Width of each ear search window, in face widths.
+    calibration_frames: int = 5            # Frames whose median scale becomes a session's scale.
+    recalibration_face_change: float = 0.1   # Relative face width change that triggers a new calibration.
+    recalibration_scale_change: float = 0.015  # Relative drift of the recent per-frame scales that moves the session scale.
+    quality_gate: bool = True              # Reject dark, overexposed, blurry or moving frames before detection.
+    quality_width: int = 160               # Width of the thumbnail the quality gate checks.
+    max_dark_share: float = 0.9            # Share of near-black thumbnail pixels that makes a frame too dark.
+    max_bright_share: float = 0.9          # Share of blown-out thumbnail pixels that makes a frame overexposed.
+    min_sharpness: float = 8.0             # Minimum variance of the thumbnail's Laplacian.
+    max_motion: float = 20.0               # Maximum mean gray-level change from the stream's previous thumbnail.
+
+# Parameters tuned for browser uploads, which vary in size and lighting.
+SERVER_CONFIG = MeasurementConfig()
+
+# Stricter parameters for the local webcam tool, which sees a steady 640x480 stream.
+WEBCAM_CONFIG = MeasurementConfig(
+    face_scale_factor=1.3,
+    face_min_neighbors=5,
+    face_min_size=100,
+    eye_scale_factor=1.2,
+    eye_min_neighbors=5,
+    eye_min_size=30
+)
+
+# Configurations by name, as chosen with --config by the offline tools.
+CONFIGS = {'server': SERVER_CONFIG, 'webcam': WEBCAM_CONFIG}
@@ -0,0 +1,64 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from .cascades import EAR_CASCADES, borrowed_cascades, get_cascade
+
+# Ear detection runs next to the eye analysis of the same frame, on threads that
+# borrow their cascades from the same per-process pool as the measuring threads.
+_executor = None
+
+def _get_executor():
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix='ears')
+    return _executor
+
+def ear_windows(face, config, bounds_width, bounds_height):
+    """
+    Returns the (x0, y0, x1, y1) search windows beside the face box, image-left
+    first. Each reaches `ear_window` face widths outwards (and a tenth inwards)
+    and spans the face from the brows down.
+    """
+    x, y, w, h = face
+    y0, y1 = y + int(h * 0.15), min(bounds_height, y + h)
+    reach, overlap = int(w * config.ear_window), int(w * 0.1)
+    left = (max(0, x - reach), y0, min(bounds_width, x + overlap), y1)
+    right = (max(0, x + w - overlap), y0, min(bounds_width, x + w + reach), y1)
+    return left, right
+
+def detect_ears(gray, face, config, scale=1.0):
+    """
+    Finds the ears in narrow windows to the left and right of the face box.
+    Both ear cascades search both windows: which ear lands on which side of the
+    image depends on whether the client mirrors its frames (the webcam tool
+    does, the web page does not). `gray` may be a downscaled copy of the frame
+    (`scale` its relative size); `face` and the returned boxes are in full-frame
+    coordinates. Returns ({'left': box or None, 'right': box or None}, seconds
+    spent), keyed by side of the image.
+    """
+    started = time.perf_counter()
+    scaled_face = tuple(int(v * scale) for v in face)
+    windows = ear_windows(scaled_face, config, gray.shape[1], gray.shape[0])
+    with borrowed_cascades():
+        ears = _search_ears(gray, windows, config, scale)
+    return ears, time.perf_counter() - started
+
+def _search_ears(gray, windows, config, scale):
+    ears = {}
+    for side, (x0, y0, x1, y1) in zip(('left', 'right'), windows):
+        ears[side] = None
+        if x1 - x0 < 12 or y1 - y0 < 20:
+            continue
+        boxes = [box for cascade_name in EAR_CASCADES
+                 for box in get_cascade(cascade_name).detectMultiScale(gray[y0:y1, x0:x1],
+                                                                       scaleFactor=config.ear_scale_factor,
+                                                                       minNeighbors=config.ear_min_neighbors)]
+        if boxes:
+            # The largest candidate is the most likely to be the ear itself.
+            bx, by, bw, bh = max(boxes, key=lambda b: b[2] * b[3])
+            ears[side] = tuple(int(round(v / scale)) for v in (bx + x0, by + y0, bw, bh))
+    return ears
+
+def submit_ear_detection(gray, face, config, scale=1.0):
+    """Starts detect_ears on a helper thread and returns its Future."""
+    return _get_executor().submit(detect_ears, gray, face, config, scale)
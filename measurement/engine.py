@@ -0,0 +1,188 @@
+import time
+from dataclasses import dataclass, field
+from typing import Optional
+
+import cv2
+
+from .cascades import EYE_CASCADE, FACE_CASCADE, borrowed_cascades, get_cascade
+from .config import SERVER_CONFIG
+from .ears import submit_ear_detection
+from .estimator import SCALE_KEY
+from .eyes import analyze_eye
+from .geometry import (compute_dimensions, compute_ear_offsets, is_face_centered, mm_per_pixel,
+                       pupil_distance_pixels)
+from .quality import QUALITY_BLUR, QUALITY_DARK, QUALITY_MOTION, QUALITY_OVEREXPOSED, check_quality, quality_thumbnail
+from .tracking import FaceTracker
+
+ERROR_INVALID_IMAGE = "Invalid image data."
+ERROR_NO_FACE = "No face detected. Please ensure your face is visible and well-lit."
+ERROR_NO_EYES = "Not enough eyes detected. Please center your face properly."
+ERROR_NOT_CENTERED = "No centered face found. Please adjust your position."
+ERROR_TOO_DARK = "Image is too dark. Please add light in front of your face."
+ERROR_OVEREXPOSED = "Image is overexposed. Please avoid bright light behind you or shining into the camera."
+ERROR_BLURRY = "Image is blurry. Please hold still and make sure the camera is in focus."
+ERROR_MOTION = "Too much movement. Please hold still."
+
+# Errors of frames rejected by the quality gate, by reason.
+QUALITY_ERRORS = {
+    QUALITY_DARK: ERROR_TOO_DARK,
+    QUALITY_OVEREXPOSED: ERROR_OVEREXPOSED,
+    QUALITY_BLUR: ERROR_BLURRY,
+    QUALITY_MOTION: ERROR_MOTION,
+}
+
+# Short alignment hints for on-screen overlays and live sessions.
+ALIGNMENT_HINTS = {
+    ERROR_NO_FACE: "No face detected",
+    ERROR_NO_EYES: "Align Face in Oval",
+    ERROR_NOT_CENTERED: "Align Face in Oval",
+    ERROR_TOO_DARK: "Too dark - add light",
+    ERROR_OVEREXPOSED: "Too bright - avoid backlight",
+    ERROR_BLURRY: "Blurry - hold still",
+    ERROR_MOTION: "Hold still",
+}
+
+
+@dataclass
+class MeasurementResult:
+    """
+    Outcome of measuring one frame. Exactly one of `measurement` and `error` is set.
+    `face` and `ears` are in frame coordinates, `eyes` relative to the face box.
+    `timings` maps each pipeline stage that ran to its duration in seconds.
+    """
+    measurement: Optional[dict] = None
+    error: Optional[str] = None
+    face: Optional[tuple] = None
+    eyes: list = field(default_factory=list)
+    ears: dict = field(default_factory=dict)
+    detection_scale: float = 1.0
+    pixel_to_mm_ratio: Optional[float] = None
+    scale_calibrated: bool = False      # The scale came from the session calibration, not this frame.
+    timings: dict = field(default_factory=dict)
+
+# Pipeline stages reported in MeasurementResult.timings, in execution order.
+# 'ear_cascade' runs on a helper thread at the same time as 'hough'.
+STAGES = ('preprocess', 'quality', 'face_cascade', 'eye_cascade', 'hough', 'ear_cascade', 'math')
+
+
+def measure(frame, config=SERVER_CONFIG, tracker=None, calibration=None):
+    """
+    Detects the face and eyes in a BGR or grayscale frame and measures the eye
+    width, bridge width and B size in millimetres. With config.measure_ear_offsets,
+    the ears are searched beside the face and the frontal eye-to-ear offsets are
+    added (None for a side whose ear was not found). The frame's scale is
+    included under SCALE_KEY.
+    Frames that are too dark, overexposed or blurry, or (given the stream's
+    FaceTracker) moving too much, are rejected by a quality gate before any cascade.
+    When a FaceTracker from the previous frame of the same stream is given, the
+    cascades only search around the tracked face and eyes, and the tracker is updated.
+    When the stream's ScaleCalibration is given, its scale replaces the per-frame
+    interpupillary scale once calibrated, and this frame's scale feeds it until then.
+    """
+    with borrowed_cascades():
+        return _measure(frame, config, tracker, calibration)
+
+def _measure(frame, config, tracker, calibration):
+    if frame is None or frame.size == 0:
+        return MeasurementResult(error=ERROR_INVALID_IMAGE)
+    if tracker is None:
+        tracker = FaceTracker(config.tracker_padding, config.lost_frame_threshold, config.tracker_refresh_interval)
+    timings = {}
+    started = time.perf_counter()
+
+    gray = frame if frame.ndim == 2 else cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+    frame_height, frame_width = gray.shape[:2]
+
+    # Coarse pass: find the face on a downscaled copy; boxes come back in full-resolution coordinates.
+    detection_scale = 1.0
+    if config.detection_width:
+        detection_scale = min(1.0, config.detection_width / frame_width)
+    if detection_scale < 1.0:
+        detection_gray = cv2.resize(gray, None, fx=detection_scale, fy=detection_scale, interpolation=cv2.INTER_AREA)
+    else:
+        detection_gray = gray
+    # The frontal face cascade cannot detect anything smaller than its 24x24 window.
+    min_face = max(24, int(config.face_min_size * detection_scale))
+    started = _lap(timings, 'preprocess', started)
+
+    # Quality gate: a thumbnail check costs far less than a cascade on a frame that cannot be measured.
+    if config.quality_gate:
+        thumbnail = quality_thumbnail(detection_gray, config.quality_width)
+        reason = check_quality(thumbnail, config, tracker.thumbnail)
+        tracker.thumbnail = thumbnail
+        started = _lap(timings, 'quality', started)
+        if reason:
+            return MeasurementResult(error=QUALITY_ERRORS[reason], detection_scale=round(detection_scale, 3),
+                                     timings=timings)
+    faces = tracker.detect_faces(detection_gray, get_cascade(FACE_CASCADE), scale=detection_scale,
+                                 scaleFactor=config.face_scale_factor,
+                                 minNeighbors=config.face_min_neighbors,
+                                 minSize=(min_face, min_face))
+    detection_scale = round(detection_scale, 3)
+    started = _lap(timings, 'face_cascade', started)
+
+    if len(faces) == 0:
+        return MeasurementResult(error=ERROR_NO_FACE, detection_scale=detection_scale, timings=timings)
+
+    for (x, y, w, h) in faces:
+        if not is_face_centered(x, y, w, h, frame_width, frame_height):
+            continue
+
+        # Fine pass: eyes and irises are searched at full resolution inside the face.
+        roi_gray = gray[y:y+h, x:x+w]
+        eyes = tracker.detect_eyes(roi_gray, get_cascade(EYE_CASCADE),
+                                   scaleFactor=config.eye_scale_factor,
+                                   minNeighbors=config.eye_min_neighbors,
+                                   minSize=(config.eye_min_size, config.eye_min_size))
+        started = _lap(timings, 'eye_cascade', started)
+        if len(eyes) < 2:
+            tracker.track((x, y, w, h))
+            return MeasurementResult(error=ERROR_NO_EYES, face=(x, y, w, h), eyes=list(eyes),
+                                     detection_scale=detection_scale, timings=timings)
+
+        # Sort eyes based on x-coordinate (left to right)
+        eye_boxes = sorted(eyes, key=lambda b: b[0])
+        left_eye = eye_boxes[0]
+        right_eye = eye_boxes[1]
+        tracker.track((x, y, w, h), [left_eye, right_eye])
+
+        # The ears are searched in windows beside the face while the irises are analysed.
+        ear_future = None
+        if config.measure_ear_offsets:
+            ear_future = submit_ear_detection(detection_gray, (x, y, w, h), config,
+                                              detection_gray.shape[1] / frame_width)
+
+        # One circle search per eye on the grayscale face ROI gives both iris and pupil.
+        left_analysis = analyze_eye(roi_gray[left_eye[1]:left_eye[1] + left_eye[3], left_eye[0]:left_eye[0] + left_eye[2]])
+        right_analysis = analyze_eye(roi_gray[right_eye[1]:right_eye[1] + right_eye[3], right_eye[0]:right_eye[0] + right_eye[2]])
+        started = _lap(timings, 'hough', started)
+        ears = {}
+        if ear_future is not None:
+            ears, timings['ear_cascade'] = ear_future.result()
+            started = time.perf_counter()
+
+        frame_scale = mm_per_pixel(pupil_distance_pixels(left_eye, right_eye, left_analysis, right_analysis),
+                                   config.known_distance_mm)
+        pixel_to_mm_ratio = calibration.scale(w, frame_scale) if calibration is not None else None
+        scale_calibrated = pixel_to_mm_ratio is not None
+        if not scale_calibrated:
+            pixel_to_mm_ratio = frame_scale
+            if calibration is not None:
+                calibration.add(w, frame_scale)
+        measurement = compute_dimensions(left_eye, right_eye, left_analysis, right_analysis, config.known_distance_mm,
+                                         pixel_to_mm_ratio)
+        measurement[SCALE_KEY] = round(pixel_to_mm_ratio, 4)
+        if ear_future is not None:
+            measurement.update(compute_ear_offsets((x, y, w, h), left_eye, right_eye, ears, pixel_to_mm_ratio))
+        _lap(timings, 'math', started)
+        return MeasurementResult(measurement=measurement, face=(x, y, w, h), eyes=eye_boxes, ears=ears,
+                                 detection_scale=detection_scale, pixel_to_mm_ratio=pixel_to_mm_ratio,
+                                 scale_calibrated=scale_calibrated, timings=timings)
+
+    return MeasurementResult(error=ERROR_NOT_CENTERED, detection_scale=detection_scale, timings=timings)
+
+def _lap(timings, stage, started):
+    """Adds the time since `started` to a stage and returns the new lap start."""
+    now = time.perf_counter()
+    timings[stage] = timings.get(stage, 0.0) + (now - started)
+    return now
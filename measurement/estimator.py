@@ -0,0 +1,221 @@
+import numpy as np
+
+MEASUREMENT_KEYS = ('eye_width_mm', 'bridge_width_mm', 'b_size_mm')
+# Optional per-frame values; None (or absent) when the ear on that side was not found.
+EAR_OFFSET_KEYS = ('left_ear_offset_mm', 'right_ear_offset_mm')
+# The frame's scale, which the engine adds to every measurement; it sets the finest spread a dimension can have.
+SCALE_KEY = 'mm_per_pixel'
+OUTLIER_MAD_THRESHOLD = 3.0    # Frames further than this many scaled MADs from the median are dropped.
+
+# Defaults of a scan, shared by the webcam tool, the live endpoint and batch runs.
+MAX_FRAMES = 100        # A scan stops after this many measured frames even if not converged.
+MIN_FRAMES = 10         # Frames screened together before the estimate can converge.
+TOLERANCE_MM = 0.5      # A scan ends once every dimension is known to +/- this (95% confidence).
+
+def _ear_offset_values(measurements):
+    # One row per frame, one column per side, NaN where it was not measured.
+    return np.array([[np.nan if m.get(key) is None else m[key] for key in EAR_OFFSET_KEYS] for m in measurements],
+                    dtype=float).reshape(-1, len(EAR_OFFSET_KEYS))
+
+def _ear_offset_medians(values):
+    medians = {}
+    for key, column in zip(EAR_OFFSET_KEYS, values.T):
+        column = column[~np.isnan(column)]
+        medians[key] = round(float(np.median(column)), 2) if len(column) else None
+    return medians
+
+def aggregate_measurements(measurements):
+    """
+    Combines per-frame measurements into one robust estimate.
+    Frames with any dimension further than OUTLIER_MAD_THRESHOLD scaled MADs from
+    the median are rejected, then the median of the remaining frames is returned.
+    Ear offsets are the median over the inlier frames that have one.
+    Returns (aggregate, inlier_count).
+    """
+    values = np.array([[m[key] for key in MEASUREMENT_KEYS] for m in measurements], dtype=float)
+    median = np.median(values, axis=0)
+    # 1.4826 scales the MAD to match the standard deviation of normally distributed data.
+    mad = 1.4826 * np.median(np.abs(values - median), axis=0)
+    mad[mad == 0] = np.inf
+    inliers = np.all(np.abs(values - median) / mad <= OUTLIER_MAD_THRESHOLD, axis=1)
+    if not inliers.any():
+        inliers[:] = True
+    aggregate_values = np.median(values[inliers], axis=0)
+    aggregate = {key: round(float(v), 2) for key, v in zip(MEASUREMENT_KEYS, aggregate_values)}
+    aggregate.update(_ear_offset_medians(_ear_offset_values(measurements)[inliers]))
+    return aggregate, int(inliers.sum())
+
+class StreamingEstimator:
+    """
+    Online estimator for a capture loop. Accepted measurements go into a
+    preallocated ring buffer (the last `capacity` frames) used for the robust
+    statistics, and into running Welford mean/variance over every accepted frame.
+
+    The first `min_frames` frames are screened together with the same MAD rule
+    as aggregate_measurements; after that each new frame is rejected if any
+    dimension is further than OUTLIER_MAD_THRESHOLD scaled MADs from the buffer
+    median. The estimate has converged once the confidence interval of every
+    dimension's mean is within +/- tolerance_mm. Ear offsets are buffered
+    alongside (NaN when missing) and reported as their median, but do not
+    affect rejection or convergence.
+
+    Dimensions are quantized to whole pixels, so the MAD of a still subject can
+    be zero or a fraction of a pixel, and a frame one pixel off would be
+    rejected. The MAD is floored at `min_spread_px` pixels, converted with the
+    median frame scale (SCALE_KEY) of the buffer; measurements without a scale
+    fall back to `min_spread_mm`.
+
+    The median only moves with accepted frames, so when the measurements shift
+    and stay shifted (the subject moved, the scale was recalibrated) every later
+    frame would be rejected. After `max_consecutive_rejections` rejections in a
+    row the estimator re-anchors: the accepted frames are dropped and the
+    rejected run is screened as a fresh warm-up.
+    """
+
+    def __init__(self, capacity=MAX_FRAMES, min_frames=MIN_FRAMES, tolerance_mm=TOLERANCE_MM, z=1.96, min_spread_px=1.0,
+                 min_spread_mm=0.3, max_consecutive_rejections=None):
+        self.capacity = capacity
+        self.min_frames = min_frames
+        self.max_consecutive_rejections = max_consecutive_rejections or min_frames
+        self.tolerance_mm = tolerance_mm
+        self.z = z                           # 1.96: 95% confidence interval.
+        self.min_spread_px = min_spread_px
+        self.min_spread_mm = min_spread_mm   # About a pixel of a webcam frame, for measurements without a scale.
+        # Columns: MEASUREMENT_KEYS, EAR_OFFSET_KEYS, then the frame scale (NaN when unknown).
+        self._buffer = np.empty((capacity, len(MEASUREMENT_KEYS) + len(EAR_OFFSET_KEYS) + 1))
+        self.reset()
+
+    def reset(self):
+        self._size = 0
+        self._next = 0
+        self._screened = False
+        self.frames = 0         # Every frame added, accepted or not.
+        self.count = 0          # Accepted frames in the running statistics.
+        self.rejected = 0
+        self.reanchors = 0
+        self._rejected_run = []
+        self._mean = np.zeros(len(MEASUREMENT_KEYS))
+        self._m2 = np.zeros(len(MEASUREMENT_KEYS))
+
+    def __len__(self):
+        """Accepted frames, or the frames waiting to be screened during warm-up."""
+        return self.count if self._screened else self._size
+
+    def _push(self, values):
+        self._buffer[self._next] = values
+        self._next = (self._next + 1) % self.capacity
+        self._size = min(self._size + 1, self.capacity)
+
+    def _welford(self, values):
+        values = values[:len(MEASUREMENT_KEYS)]
+        self.count += 1
+        delta = values - self._mean
+        self._mean += delta / self.count
+        self._m2 += delta * (values - self._mean)
+
+    def _min_spread(self, values):
+        scales = values[:, -1][~np.isnan(values[:, -1])]
+        return self.min_spread_px * float(np.median(scales)) if len(scales) else self.min_spread_mm
+
+    def _spread(self, values):
+        floor = self._min_spread(values)
+        values = values[:, :len(MEASUREMENT_KEYS)]
+        median = np.median(values, axis=0)
+        return median, np.maximum(1.4826 * np.median(np.abs(values - median), axis=0), floor)
+
+    def add(self, measurement):
+        """Adds one frame's measurement. Returns False if it was rejected as an outlier."""
+        scale = measurement.get(SCALE_KEY)
+        values = np.concatenate([[measurement[key] for key in MEASUREMENT_KEYS], _ear_offset_values([measurement])[0],
+                                 [np.nan if scale is None else scale]])
+        self.frames += 1
+        if not self._screened:
+            self._push(values)
+            if self._size == self.min_frames:
+                self._screen_warmup()
+            return True
+        median, spread = self._spread(self.window())
+        if np.any(np.abs(values[:len(MEASUREMENT_KEYS)] - median) / spread > OUTLIER_MAD_THRESHOLD):
+            self.rejected += 1
+            self._rejected_run.append(values)
+            if len(self._rejected_run) >= self.max_consecutive_rejections:
+                self._reanchor()
+                return True     # This frame is part of the new anchor.
+            return False
+        self._rejected_run = []
+        self._push(values)
+        self._welford(values)
+        return True
+
+    def _reanchor(self):
+        rows = self._rejected_run
+        self._size = self._next = 0
+        self._screened = False
+        self.count = 0
+        self.rejected -= len(rows)
+        self.reanchors += 1
+        self._rejected_run = []
+        self._mean = np.zeros(len(MEASUREMENT_KEYS))
+        self._m2 = np.zeros(len(MEASUREMENT_KEYS))
+        for row in rows:
+            self._push(row)
+        if self._size >= self.min_frames:
+            self._screen_warmup()
+
+    def _screen_warmup(self):
+        # The first frames are judged together, then only the inliers seed the running statistics.
+        values = self._buffer[:self._size].copy()
+        median, spread = self._spread(values)
+        deviation = np.abs(values[:, :len(MEASUREMENT_KEYS)] - median) / spread
+        inliers = values[np.all(deviation <= OUTLIER_MAD_THRESHOLD, axis=1)]
+        self.rejected += len(values) - len(inliers)
+        self._size = self._next = 0
+        self._screened = True
+        for row in inliers:
+            self._push(row)
+            self._welford(row)
+
+    def window(self):
+        """The buffered measurements as a (frames, dimensions) array, oldest first."""
+        if self._size < self.capacity:
+            return self._buffer[:self._size]
+        return np.roll(self._buffer, -self._next, axis=0)
+
+    def mean(self):
+        return {key: round(float(v), 2) for key, v in zip(MEASUREMENT_KEYS, self._mean)} if self.count else None
+
+    def median(self):
+        if not self._size:
+            return None
+        medians = np.median(self.window()[:, :len(MEASUREMENT_KEYS)], axis=0)
+        return {key: round(float(v), 2) for key, v in zip(MEASUREMENT_KEYS, medians)}
+
+    def std(self):
+        """Sample standard deviation of each dimension, or None before two frames."""
+        if self.count < 2:
+            return None
+        return {key: float(v) for key, v in zip(MEASUREMENT_KEYS, np.sqrt(self._m2 / (self.count - 1)))}
+
+    def interval(self):
+        """Half-width of the confidence interval on each dimension's mean, in mm."""
+        std = self.std()
+        if std is None:
+            return None
+        return {key: float(self.z * s / np.sqrt(self.count)) for key, s in std.items()}
+
+    def estimate(self):
+        """
+        The mean of the accepted frames plus the median ear offsets of the
+        buffered frames (None where no ear was found). During warm-up, the median
+        of the frames waiting to be screened. None when there are none.
+        """
+        mean = self.mean() if self._screened else self.median()
+        if mean is None:
+            return None
+        return {**mean, **_ear_offset_medians(self.window()[:, len(MEASUREMENT_KEYS):-1])}
+
+    def converged(self):
+        """True once at least min_frames were accepted and every interval is within tolerance_mm."""
+        if self.count < self.min_frames:
+            return False
+        return all(half_width <= self.tolerance_mm for half_width in self.interval().values())
@@ -0,0 +1,71 @@
+import cv2
+import numpy as np
+
+def analyze_eye(gray_eye):
+    """
+    Finds the iris in a grayscale eye ROI with a single HoughCircles pass and
+    derives every eye feature from that one circle.
+    Returns a dict with 'iris' (left, right boundary), 'pupil' (x, y center),
+    'radius' and 'confidence' (share of the circle outline lying on image edges),
+    all relative to the eye ROI, or None if no circle is found.
+    """
+    if gray_eye is None or gray_eye.size == 0:
+        return None
+    gray_eye = cv2.medianBlur(gray_eye, 5)
+    eye_height = gray_eye.shape[0]
+    circles = cv2.HoughCircles(
+        gray_eye,
+        cv2.HOUGH_GRADIENT,
+        dp=1,
+        minDist=eye_height / 2,
+        param1=50,
+        param2=30,
+        minRadius=3,
+        maxRadius=max(20, int(eye_height / 2))
+    )
+    if circles is None:
+        return None
+    # Convert circle parameters to integers to avoid unsigned arithmetic issues.
+    x, y, r = np.around(circles[0, 0]).astype(int)
+
+    # HoughCircles uses param1 as the upper Canny threshold (the lower one is half of it).
+    edges = cv2.dilate(cv2.Canny(gray_eye, 25, 50), None)
+    angles = np.linspace(0, 2 * np.pi, 36, endpoint=False)
+    xs = np.clip(np.round(x + r * np.cos(angles)).astype(int), 0, gray_eye.shape[1] - 1)
+    ys = np.clip(np.round(y + r * np.sin(angles)).astype(int), 0, eye_height - 1)
+    confidence = float(np.count_nonzero(edges[ys, xs])) / len(angles)
+
+    return {
+        'iris': (int(x - r), int(x + r)),
+        'pupil': (int(x), int(y)),
+        'radius': int(r),
+        'confidence': round(confidence, 2)
+    }
+
+def to_gray(eye_roi):
+    """Returns a grayscale view of a BGR or already grayscale ROI, or None if it is empty."""
+    if eye_roi is None or eye_roi.size == 0:
+        return None
+    if eye_roi.ndim == 2:
+        return eye_roi
+    return cv2.cvtColor(eye_roi, cv2.COLOR_BGR2GRAY)
+
+def detect_iris_boundaries(eye_roi):
+    """
+    Detects the iris boundaries using HoughCircles.
+    Returns (left_boundary, right_boundary) relative to the eye ROI.
+    """
+    eye = analyze_eye(to_gray(eye_roi))
+    if eye is None:
+        return None, None
+    return eye['iris']
+
+def detect_pupil_center(eye_roi):
+    """
+    Detects the pupil center using HoughCircles.
+    Returns the (x, y) coordinates relative to the eye ROI.
+    """
+    eye = analyze_eye(to_gray(eye_roi))
+    if eye is None:
+        return None
+    return eye['pupil']
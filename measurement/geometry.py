@@ -0,0 +1,87 @@
+def is_face_centered(face_x, face_y, face_w, face_h, frame_width, frame_height):
+    """Checks if the detected face is centered and large enough."""
+    center_x = face_x + face_w // 2
+    center_y = face_y + face_h // 2
+    tolerance_x = frame_width * 0.2
+    tolerance_y = frame_height * 0.2
+    min_face_height = frame_height * 0.3  # Face must occupy at least 30% of the frame height.
+    return (
+        (frame_width // 2 - tolerance_x < center_x < frame_width // 2 + tolerance_x) and
+        (frame_height // 2 - tolerance_y < center_y < frame_height // 2 + tolerance_y) and
+        (face_h > min_face_height)
+    )
+
+def mm_per_pixel(interpupil_distance_pixels, known_distance_mm):
+    """Scale of the frame, from the measured and assumed interpupillary distance."""
+    if interpupil_distance_pixels > 0:
+        return known_distance_mm / interpupil_distance_pixels
+    return 1  # Fallback
+
+def pupil_distance_pixels(left_eye, right_eye, left_analysis, right_analysis):
+    """Distance between the pupils (or the eye box centres when an iris was not found)."""
+    if left_analysis is not None and right_analysis is not None:
+        return (right_eye[0] + right_analysis['pupil'][0]) - (left_eye[0] + left_analysis['pupil'][0])
+    return (right_eye[0] + right_eye[2] / 2) - (left_eye[0] + left_eye[2] / 2)
+
+def compute_ear_offsets(face, left_eye, right_eye, ears, pixel_to_mm_ratio):
+    """
+    Measures, on each side of the image, the straight-line distance in the image
+    plane from the outer edge of the eye box to the centre of the ear. This is a
+    frontal 2D offset of a few centimetres, not a temple length: a temple
+    runs back along the head, which a frontal frame cannot show. `ears` holds
+    frame-coordinate ear boxes (or None) under 'left' and 'right'; eye boxes are
+    relative to the face. Returns {'left_ear_offset_mm', 'right_ear_offset_mm'},
+    None where no ear was found.
+    """
+    fx, fy = face[0], face[1]
+    anchors = {
+        'left': (fx + left_eye[0], fy + left_eye[1] + left_eye[3] / 2),
+        'right': (fx + right_eye[0] + right_eye[2], fy + right_eye[1] + right_eye[3] / 2),
+    }
+    offsets = {}
+    for side, (ax, ay) in anchors.items():
+        ear = ears.get(side)
+        if ear is None:
+            offsets[f'{side}_ear_offset_mm'] = None
+            continue
+        ex, ey = ear[0] + ear[2] / 2, ear[1] + ear[3] / 2
+        offsets[f'{side}_ear_offset_mm'] = round(((ex - ax) ** 2 + (ey - ay) ** 2) ** 0.5 * pixel_to_mm_ratio, 2)
+    return offsets
+
+def compute_dimensions(left_eye, right_eye, left_analysis, right_analysis, known_distance_mm,
+                       pixel_to_mm_ratio=None):
+    """
+    Converts the eye boxes (relative to the face ROI) and their iris analyses into
+    frame dimensions in millimetres. The scale is `pixel_to_mm_ratio` when given
+    (e.g. a session calibration), otherwise the known interpupillary distance.
+    Falls back to the eye boxes alone when either iris was not found.
+    """
+    if left_analysis is not None and right_analysis is not None:
+        # Convert the local (eye ROI) coordinates to the face ROI coordinates.
+        left_iris_global = left_eye[0] + left_analysis['iris'][0]
+        right_iris_global = right_eye[0] + right_analysis['iris'][1]
+        eye_total_width_pixels = right_iris_global - left_iris_global
+    else:
+        # Fallback if iris/pupil detection fails:
+        eye_total_width_pixels = (left_eye[2] + right_eye[2]) / 2
+
+    if pixel_to_mm_ratio is None:
+        interpupil_distance_pixels = pupil_distance_pixels(left_eye, right_eye, left_analysis, right_analysis)
+        pixel_to_mm_ratio = mm_per_pixel(interpupil_distance_pixels, known_distance_mm)
+    eye_width_mm = round(eye_total_width_pixels * pixel_to_mm_ratio, 2)
+
+    # Calculate the bridge width (distance between the eyes).
+    bridge_distance_pixels = right_eye[0] - (left_eye[0] + left_eye[2])
+    bridge_width_mm = round(bridge_distance_pixels * pixel_to_mm_ratio, 2)
+
+    # Estimate vertical dimension ("b_size") using a fraction of the eye height.
+    left_eye_height = min(left_eye[3], int(left_eye[2] * 0.6))
+    right_eye_height = min(right_eye[3], int(right_eye[2] * 0.6))
+    b_size_pixels = max(left_eye_height, right_eye_height)
+    b_size_mm = round(b_size_pixels * pixel_to_mm_ratio, 2)
+
+    return {
+        'eye_width_mm': eye_width_mm,
+        'bridge_width_mm': bridge_width_mm,
+        'b_size_mm': b_size_mm
+    }
@@ -0,0 +1,34 @@
+import cv2
+import numpy as np
+
+# Reasons a frame fails the quality gate.
+QUALITY_DARK = 'dark'
+QUALITY_OVEREXPOSED = 'overexposed'
+QUALITY_BLUR = 'blur'
+QUALITY_MOTION = 'motion'
+
+def quality_thumbnail(gray, width):
+    """The small grayscale copy the quality gate works on."""
+    if gray.shape[1] <= width:
+        return gray
+    height = max(1, int(round(gray.shape[0] * width / gray.shape[1])))
+    return cv2.resize(gray, (width, height), interpolation=cv2.INTER_AREA)
+
+def check_quality(thumbnail, config, previous=None):
+    """
+    Screens a frame thumbnail before any cascade runs. Checks exposure (share of
+    crushed or blown-out pixels), sharpness (variance of the Laplacian) and, when
+    the previous thumbnail of the stream is given, motion (mean absolute
+    difference). Returns the first failing reason (QUALITY_*) or None.
+    """
+    pixels = thumbnail.size
+    if np.count_nonzero(thumbnail < 25) > config.max_dark_share * pixels:
+        return QUALITY_DARK
+    if np.count_nonzero(thumbnail > 245) > config.max_bright_share * pixels:
+        return QUALITY_OVEREXPOSED
+    if cv2.Laplacian(thumbnail, cv2.CV_32F).var() < config.min_sharpness:
+        return QUALITY_BLUR
+    if previous is not None and previous.shape == thumbnail.shape:
+        if cv2.absdiff(thumbnail, previous).mean() > config.max_motion:
+            return QUALITY_MOTION
+    return None
@@ -0,0 +1,48 @@
+import threading
+import time
+from collections import OrderedDict
+
+
+class SessionStore:
+    """
+    Per-session state of the server, keyed by session ID. Sessions idle for
+    `ttl_s` are forgotten and the least recently used are dropped beyond
+    `max_sessions`. Values handed out may be copies travelling to a worker
+    process and back, so store() must be called with the updated value.
+    """
+
+    def __init__(self, max_sessions=1024, ttl_s=600.0):
+        self.max_sessions = max_sessions
+        self.ttl_s = ttl_s
+        self._sessions = OrderedDict()
+        self._lock = threading.Lock()
+
+    def default(self):
+        """The value of an unknown or expired session."""
+        return None
+
+    def get(self, session_id):
+        """The session's value, or default() for an unknown or expired session."""
+        now = time.monotonic()
+        with self._lock:
+            entry = self._sessions.get(session_id)
+            if entry is not None and entry[1] > now:
+                self._sessions.move_to_end(session_id)
+                return entry[0]
+        return self.default()
+
+    def store(self, session_id, value):
+        with self._lock:
+            self._sessions[session_id] = (value, time.monotonic() + self.ttl_s)
+            self._sessions.move_to_end(session_id)
+            while len(self._sessions) > self.max_sessions:
+                self._sessions.popitem(last=False)
+
+    def discard(self, session_id):
+        """Forgets a finished session."""
+        with self._lock:
+            self._sessions.pop(session_id, None)
+
+    def __len__(self):
+        with self._lock:
+            return len(self._sessions)
@@ -0,0 +1,56 @@
+import os
+import time
+from dataclasses import replace
+
+import cv2
+import numpy as np
+
+from .cascades import preload
+
+IMAGE_EXTENSIONS = ('.jpg', '.jpeg', '.png', '.bmp')
+
+def iter_frames(source):
+    """
+    Yields (name, decode_seconds, frame) for every image in a directory, in name
+    order, or every frame of a video file. Frames are read one at a time.
+    """
+    if os.path.isdir(source):
+        for name in sorted(os.listdir(source)):
+            if not name.lower().endswith(IMAGE_EXTENSIONS):
+                continue
+            with open(os.path.join(source, name), 'rb') as file:
+                encoded = np.frombuffer(file.read(), np.uint8)
+            started = time.perf_counter()
+            frame = cv2.imdecode(encoded, cv2.IMREAD_COLOR)
+            yield name, time.perf_counter() - started, frame
+        return
+
+    cap = cv2.VideoCapture(source)
+    if not cap.isOpened():
+        raise IOError(f"Could not open {source}")
+    index = 0
+    try:
+        while True:
+            started = time.perf_counter()
+            ret, frame = cap.read()
+            if not ret:
+                break
+            yield f"{source}#{index}", time.perf_counter() - started, frame
+            index += 1
+    finally:
+        cap.release()
+
+def source_config(config, source):
+    """
+    The config to measure `source` with. An image directory may hold unrelated
+    stills, so frame-to-frame motion says nothing and its check is turned off.
+    """
+    if os.path.isdir(source):
+        return replace(config, max_motion=float('inf'))
+    return config
+
+def init_worker():
+    """Process pool initializer: one OpenCV thread per worker process, cascades preloaded."""
+    # The pool already provides the parallelism; OpenCV's own threads would oversubscribe the cores.
+    cv2.setNumThreads(1)
+    preload()
@@ -0,0 +1,139 @@
+class FaceTracker:
+    """
+    Remembers where the face and eyes were on the previous frame so the Haar
+    cascades only have to search a padded window around them.
+
+    The face cascade falls back to a full-frame search only after the face has been
+    missed in its window for more than `lost_frame_threshold` consecutive frames.
+    Eye positions are stored relative to the face box, so they follow the face as
+    it moves or changes size. The scales searched in a window are bounded around
+    the sizes found by the last full search, not the previous frame's, so the
+    boxes cannot shrink or grow frame by frame; every `refresh_interval` tracked
+    frames the face and eyes are searched in full again. The previous frame's
+    quality-gate thumbnail is kept too, for the motion check.
+    """
+
+    def __init__(self, padding=0.6, lost_frame_threshold=10, refresh_interval=30):
+        self.padding = padding
+        self.lost_frame_threshold = lost_frame_threshold
+        self.refresh_interval = refresh_interval
+        self.face = None          # (x, y, w, h) in frame coordinates.
+        self.eyes = None          # [(x, y, w, h), ...] as fractions of the face box.
+        self.face_size = None     # (w, h) of the face at the last full search.
+        self.eye_sizes = None     # [(w, h), ...] of the eyes at the last full search, as fractions of the face box.
+        self.lost_frames = 0
+        self.frames_tracked = 0   # Frames since the last full search.
+        self.thumbnail = None     # Quality-gate thumbnail of the previous frame.
+        self._face_searched = False
+        self._eyes_searched = False
+        self._refresh_eyes = False
+
+    def reset(self):
+        self.face = None
+        self.eyes = None
+        self.face_size = None
+        self.eye_sizes = None
+        self.lost_frames = 0
+        self.frames_tracked = 0
+        self.thumbnail = None
+        self._face_searched = False
+        self._eyes_searched = False
+        self._refresh_eyes = False
+
+    def _window(self, box, bounds_width, bounds_height):
+        """Pads a box on every side and clips it to the image bounds."""
+        x, y, w, h = box
+        pad_x = int(w * self.padding)
+        pad_y = int(h * self.padding)
+        return (max(0, x - pad_x), max(0, y - pad_y),
+                min(bounds_width, x + w + pad_x), min(bounds_height, y + h + pad_y))
+
+    @staticmethod
+    def _closest(boxes, box):
+        """The candidate nearest to `box` in position and size."""
+        return min(boxes, key=lambda b: sum(abs(a - c) for a, c in zip(b, box)))
+
+    @staticmethod
+    def _detect_in_window(gray, cascade, window, size, params):
+        """
+        Runs a cascade inside a window, only at scales within half to twice the
+        expected size. Tighter bounds cut off the larger raw detections the
+        grouping step would have averaged in, which biases the boxes small.
+        """
+        x0, y0, x1, y1 = window
+        min_w, min_h = params.get('minSize', (0, 0))
+        params = dict(params,
+                      minSize=(max(min_w, int(size[0] * 0.5)), max(min_h, int(size[1] * 0.5))),
+                      maxSize=(int(size[0] * 2) + 1, int(size[1] * 2) + 1))
+        boxes = cascade.detectMultiScale(gray[y0:y1, x0:x1], **params)
+        return [(int(bx) + x0, int(by) + y0, int(bw), int(bh)) for (bx, by, bw, bh) in boxes]
+
+    def detect_faces(self, gray, cascade, scale=1.0, **params):
+        """
+        Detects faces, searching around the tracked face when there is one.
+        `gray` may be a downscaled copy of the frame, `scale` being its size relative
+        to the frame. Returns the face boxes in full-frame coordinates.
+        """
+        if self.face is not None and self.frames_tracked < self.refresh_interval:
+            face = tuple(int(v * scale) for v in self.face)
+            size = tuple(int(v * scale) for v in self.face_size)
+            window = self._window(face, gray.shape[1], gray.shape[0])
+            faces = self._detect_in_window(gray, cascade, window, size, params)
+            if faces:
+                self.lost_frames = 0
+                # Put the box closest to the previous face first.
+                closest = self._closest(faces, face)
+                faces.sort(key=lambda f: f != closest)
+                return [tuple(int(v / scale) for v in f) for f in faces]
+            self.lost_frames += 1
+            if self.lost_frames <= self.lost_frame_threshold:
+                return []
+            self.reset()
+        if self.face is not None:
+            # Periodic full search while tracking; the eyes are searched in full too.
+            self._refresh_eyes = True
+        self.frames_tracked = 0
+        self._face_searched = True
+        return [tuple(int(v / scale) for v in face) for face in cascade.detectMultiScale(gray, **params)]
+
+    def detect_eyes(self, roi_gray, cascade, **params):
+        """
+        Detects eyes inside the face ROI, searching around the tracked eyes first
+        and falling back to the whole face ROI if either one is not found there.
+        Returns the eye boxes relative to the face ROI.
+        """
+        if self.eyes is not None and not self._refresh_eyes:
+            roi_h, roi_w = roi_gray.shape[:2]
+            eyes = []
+            for (fx, fy, fw, fh), (sw, sh) in zip(self.eyes, self.eye_sizes):
+                box = (int(fx * roi_w), int(fy * roi_h), int(fw * roi_w), int(fh * roi_h))
+                window = self._window(box, roi_w, roi_h)
+                found = self._detect_in_window(roi_gray, cascade, window, (int(sw * roi_w), int(sh * roi_h)), params)
+                if not found:
+                    break
+                eyes.append(self._closest(found, box))
+            else:
+                return eyes
+        self._refresh_eyes = False
+        self._eyes_searched = True
+        return [tuple(int(v) for v in eye) for eye in cascade.detectMultiScale(roi_gray, **params)]
+
+    def track(self, face, eyes=None):
+        """
+        Records the face that was measured on this frame, and optionally its eye
+        boxes (relative to the face ROI), as the search origin for the next frame.
+        """
+        x, y, w, h = (int(v) for v in face)
+        self.face = (x, y, w, h)
+        self.lost_frames = 0
+        self.frames_tracked += 1
+        if self._face_searched or self.face_size is None:
+            self.face_size = (w, h)
+        if eyes:
+            self.eyes = [(ex / w, ey / h, ew / w, eh / h) for (ex, ey, ew, eh) in eyes]
+            if self._eyes_searched or self.eye_sizes is None:
+                self.eye_sizes = [(ew, eh) for (_, _, ew, eh) in self.eyes]
+        else:
+            self.eyes = None
+            self.eye_sizes = None
+        self._face_searched = self._eyes_searched = False
@@ -0,0 +1,20 @@
+"""
+Local frame-mesh generator. Fits the exported frame template (public/model.obj)
+to measured dimensions, so previews do not need a round trip to Onshape.
+"""
+from .binary import MeshCache, decode_mesh, encode_mesh, encoded_mesh
+from .fit import (
+    IRIS_DIAMETER_MM,
+    PARAMETER_RANGES,
+    TEMPLATE_PATH,
+    FrameTemplate,
+    clamp_parameters,
+    deform,
+    fit_frame,
+    fit_parameters,
+    fitted_obj,
+    get_template,
+    lens_width,
+    split_template,
+)
+from .obj import ObjMesh, load_obj, parse_obj
@@ -0,0 +1,138 @@
+"""
+Compact binary mesh format for the frame previews.
+
+Layout (little endian, every section starts on a 4-byte boundary):
+
+    offset  size      field
+    0       4         magic b'TSMB'
+    4       2         format version (1)
+    6       2         flags: bit 0 set when indices are uint32, else uint16
+    8       4         vertex count V
+    12      4         index count I (3 per triangle)
+    16      12        bounds minimum, 3 x float32
+    28      12        bounds maximum, 3 x float32
+    40      6V        positions, 3 x uint16 per vertex, 0..65535 across the bounds
+    ...     pad to 4
+    ...     I x 2|4   triangle indices
+
+Vertices that coincide after quantization are merged. Normals are not stored:
+the OBJ export has no smoothing groups, so the viewer shades faces flat, as
+OBJLoader does. A client can view each section with a typed array directly,
+and position = min + q / 65535 * (max - min).
+
+    python -m mesh.binary public/model.obj public/model.bin
+"""
+import argparse
+import hashlib
+import struct
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+from .obj import load_obj
+
+MAGIC = b'TSMB'
+VERSION = 1
+FLAG_UINT32_INDICES = 1
+HEADER = struct.Struct('<4sHHII3f3f')
+QUANTIZATION_LEVELS = 65535
+BINARY_CACHE_SIZE = 32
+CONTENT_TYPE = 'application/octet-stream'
+
+def _pad(data):
+    return data + b'\0' * (-len(data) % 4)
+
+def encode_mesh(mesh):
+    """Encodes an ObjMesh (or anything with `vertices` and `triangles`) in the format above."""
+    vertices = np.asarray(mesh.vertices, dtype=np.float64)
+    low = vertices.min(axis=0).astype(np.float32)
+    high = vertices.max(axis=0).astype(np.float32)
+    extent = np.where(high > low, high - low, 1).astype(np.float64)
+    quantized = np.rint((vertices - low) / extent * QUANTIZATION_LEVELS).astype(np.uint16)
+
+    # Merge coincident vertices, keeping them in order of first use.
+    unique, first, inverse = np.unique(quantized, axis=0, return_index=True, return_inverse=True)
+    order = np.argsort(first)
+    remap = np.empty(len(order), dtype=np.int64)
+    remap[order] = np.arange(len(order))
+    positions = unique[order]
+    triangles = remap[inverse.reshape(-1)[mesh.triangles]]
+    # Drop triangles that collapsed to a line or a point.
+    triangles = triangles[(triangles[:, 0] != triangles[:, 1]) & (triangles[:, 1] != triangles[:, 2])
+                          & (triangles[:, 0] != triangles[:, 2])]
+
+    wide = len(positions) > 0xFFFF
+    indices = triangles.astype('<u4' if wide else '<u2').reshape(-1)
+    header = HEADER.pack(MAGIC, VERSION, FLAG_UINT32_INDICES if wide else 0,
+                         len(positions), len(indices), *low.tolist(), *high.tolist())
+    return header + _pad(positions.astype('<u2').tobytes()) + indices.tobytes()
+
+def decode_mesh(data):
+    """Returns (positions as float32 (V, 3), triangles (T, 3)) from encoded bytes."""
+    magic, version, flags, vertex_count, index_count, *bounds = HEADER.unpack_from(data)
+    if magic != MAGIC or version != VERSION:
+        raise ValueError("Not a version 1 TSMB mesh")
+    low, high = np.array(bounds[:3], np.float32), np.array(bounds[3:], np.float32)
+    offset = HEADER.size
+    quantized = np.frombuffer(data, '<u2', vertex_count * 3, offset).reshape(-1, 3)
+    offset += vertex_count * 6 + (-vertex_count * 6 % 4)
+    index_type = '<u4' if flags & FLAG_UINT32_INDICES else '<u2'
+    triangles = np.frombuffer(data, index_type, index_count, offset).reshape(-1, 3)
+    positions = low + quantized.astype(np.float32) / QUANTIZATION_LEVELS * (high - low)
+    return positions, triangles
+
+def content_hash(mesh):
+    """Hash of the geometry an encoding depends on."""
+    digest = hashlib.sha256()
+    digest.update(np.ascontiguousarray(mesh.vertices, dtype=np.float64).tobytes())
+    digest.update(np.ascontiguousarray(mesh.triangles, dtype=np.int32).tobytes())
+    return digest.hexdigest()
+
+
+class MeshCache:
+    """
+    Encoded meshes keyed by the content hash of their geometry, least recently
+    used first out. Each entry carries the hash of the encoded bytes for use as
+    a strong ETag.
+    """
+
+    def __init__(self, max_entries=BINARY_CACHE_SIZE):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, mesh):
+        """Returns (encoded bytes, etag) for the mesh, encoding it on a miss."""
+        key = content_hash(mesh)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                return entry
+        data = encode_mesh(mesh)
+        entry = (data, hashlib.sha256(data).hexdigest())
+        with self._lock:
+            self._entries[key] = entry
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return entry
+
+_cache = MeshCache()
+
+def encoded_mesh(mesh):
+    """Returns (encoded bytes, etag) from the process-wide cache."""
+    return _cache.get(mesh)
+
+def main():
+    parser = argparse.ArgumentParser(description="Convert an OBJ mesh to the TSMB binary format.")
+    parser.add_argument('obj')
+    parser.add_argument('out')
+    args = parser.parse_args()
+    data = encode_mesh(load_obj(args.obj))
+    with open(args.out, 'wb') as file:
+        file.write(data)
+    print(f"Wrote {len(data)} bytes to {args.out}")
+
+if __name__ == '__main__':
+    main()
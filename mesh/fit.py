@@ -0,0 +1,191 @@
+import os
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Dict, Tuple
+
+import numpy as np
+
+from .obj import load_obj
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+TEMPLATE_PATH = os.path.join(REPO_DIR, 'public', 'model.obj')
+
+MM = 0.001                # The template is exported in metres.
+BRIDGE_OFFSET_MM = 5      # Bridge bar width = bridge width + this, as in onshape.py (BridgeWid).
+FIT_CACHE_SIZE = 32       # Fitted meshes kept per process, keyed by rounded parameters.
+PARAMETER_STEP_MM = 0.1   # Parameters are rounded to this before fitting and caching.
+IRIS_DIAMETER_MM = 11.7   # Average adult iris; the scan's eye width is the pupil distance plus one iris.
+
+# Range each frame parameter is clamped to, in millimetres: what the template can
+# be stretched to. Only outliers (e.g. a scan whose irises were missed) fall outside.
+PARAMETER_RANGES = {
+    'lens_width_mm': (30, 70),
+    'bridge_width_mm': (10, 30),
+    'b_size_mm': (20, 60),
+}
+
+
+@dataclass(frozen=True)
+class FrameTemplate:
+    """
+    The template mesh split into its parts. The bridge is the group spanning the
+    frame's centre line; on each side the widest group is the lens (rim and lens)
+    and the others (the temple) are attached to it.
+    """
+    mesh: object
+    center_x: float
+    bridge: int
+    lenses: Dict[int, int]                 # side (-1 or 1) -> group
+    attachments: Dict[int, Tuple[int, ...]]
+    dimensions: Dict[str, float]           # Parameters the unmodified template corresponds to.
+
+
+def _bounds(points):
+    return points.min(axis=0), points.max(axis=0)
+
+def split_template(mesh):
+    """Identifies the bridge, lens and temple groups of a frame mesh."""
+    low, high = _bounds(mesh.vertices)
+    center_x = (low[0] + high[0]) / 2
+    bridge = None
+    sides = {-1: [], 1: []}
+    for group in range(mesh.group_count):
+        group_low, group_high = _bounds(mesh.vertices[mesh.vertex_groups == group])
+        if group_low[0] < center_x < group_high[0]:
+            bridge = group
+        else:
+            sides[1 if group_low[0] > center_x else -1].append((group_high[0] - group_low[0], group))
+    if bridge is None or not sides[-1] or not sides[1]:
+        raise ValueError("Template has no bridge or is missing a lens")
+
+    lenses = {side: max(groups)[1] for side, groups in sides.items()}
+    attachments = {side: tuple(group for _, group in groups if group != lenses[side])
+                   for side, groups in sides.items()}
+
+    bridge_low, bridge_high = _bounds(mesh.vertices[mesh.vertex_groups == bridge])
+    lens_low, lens_high = _bounds(mesh.vertices[mesh.vertex_groups == lenses[1]])
+    dimensions = {
+        'lens_width_mm': float(lens_high[0] - lens_low[0]) / MM,
+        'bridge_width_mm': float(bridge_high[0] - bridge_low[0]) / MM - BRIDGE_OFFSET_MM,
+        'b_size_mm': float(lens_high[1] - lens_low[1]) / MM,
+    }
+    return FrameTemplate(mesh, center_x, bridge, lenses, attachments, dimensions)
+
+@lru_cache(maxsize=None)
+def get_template():
+    """Returns the frame template (public/model.obj), loading it on first use in this process."""
+    return split_template(load_obj(TEMPLATE_PATH))
+
+def lens_width(eye_width_mm, bridge_width_mm):
+    """
+    The lens width (Onshape's LensWid) for a scan. The engine's eye width spans
+    both irises, outer edge to outer edge: the pupil distance plus one iris
+    diameter. The lenses are centred on the pupils, so lens width plus bridge
+    width is the pupil distance.
+    """
+    return eye_width_mm - IRIS_DIAMETER_MM - bridge_width_mm
+
+def _number(name, value):
+    try:
+        value = float(value)
+    except (TypeError, ValueError):
+        raise ValueError(f"{name} must be a number")
+    if not np.isfinite(value):
+        raise ValueError(f"{name} must be a number")
+    return value
+
+def clamp_parameters(eye_width_mm=None, bridge_width_mm=None, b_size_mm=None):
+    """
+    Turns a scan's measurements into frame parameters: the eye width is mapped
+    to a lens width (see lens_width), then each parameter is clamped to
+    PARAMETER_RANGES and rounded to PARAMETER_STEP_MM. Missing ones take the
+    template's own (unrounded) value. Returns ((lens_width_mm, bridge_width_mm,
+    b_size_mm), clamped), where clamped maps each clamped parameter to the value
+    used; raises ValueError for a value that is not a finite number.
+    """
+    defaults = get_template().dimensions
+    given = {'eye_width_mm': eye_width_mm, 'bridge_width_mm': bridge_width_mm, 'b_size_mm': b_size_mm}
+    values = {name: None if value is None else _number(name, value) for name, value in given.items()}
+    bridge = defaults['bridge_width_mm'] if values['bridge_width_mm'] is None else values['bridge_width_mm']
+    frame = {
+        'lens_width_mm': None if values['eye_width_mm'] is None else lens_width(values['eye_width_mm'], bridge),
+        'bridge_width_mm': values['bridge_width_mm'],
+        'b_size_mm': values['b_size_mm'],
+    }
+    params = []
+    clamped = {}
+    for name, value in frame.items():
+        if value is None:
+            params.append(defaults[name])
+            continue
+        low, high = PARAMETER_RANGES[name]
+        if not low <= value <= high:
+            value = clamped[name] = min(max(value, low), high)
+        params.append(round(round(value / PARAMETER_STEP_MM) * PARAMETER_STEP_MM, 2))
+    return tuple(params), clamped
+
+def fit_parameters(eye_width_mm=None, bridge_width_mm=None, b_size_mm=None):
+    """The (lens_width_mm, bridge_width_mm, b_size_mm) tuple of clamp_parameters; raises ValueError."""
+    return clamp_parameters(eye_width_mm, bridge_width_mm, b_size_mm)[0]
+
+def deform(template, lens_width_mm, bridge_width_mm, b_size_mm):
+    """
+    Returns the template mesh resized to the given parameters.
+
+    The bridge bar is stretched by moving its two halves apart; each lens is then
+    scaled from its inner edge (width) and its centre line (height) and moved
+    with the bridge end, and the temples follow their lens's hinge.
+    """
+    mesh = template.mesh
+    vertices = mesh.vertices.copy()
+    normals = mesh.normals.copy()
+    dims = template.dimensions
+    scale_x = lens_width_mm / dims['lens_width_mm']
+    scale_y = b_size_mm / dims['b_size_mm']
+    shift = (bridge_width_mm - dims['bridge_width_mm']) / 2 * MM
+
+    in_bridge = mesh.vertex_groups == template.bridge
+    offset = vertices[in_bridge, 0] - template.center_x
+    vertices[in_bridge, 0] += np.sign(offset) * shift
+
+    for side, lens in template.lenses.items():
+        in_lens = mesh.vertex_groups == lens
+        low, high = _bounds(mesh.vertices[in_lens])
+        inner_x = low[0] if side > 0 else high[0]
+        center_y = (low[1] + high[1]) / 2
+
+        def move(points):
+            moved = points.copy()
+            moved[..., 0] = inner_x + side * shift + (points[..., 0] - inner_x) * scale_x
+            moved[..., 1] = center_y + (points[..., 1] - center_y) * scale_y
+            return moved
+
+        vertices[in_lens] = move(mesh.vertices[in_lens])
+        # Normals of a scaled surface transform by the inverse scale.
+        lens_normals = mesh.normal_groups == lens
+        scaled = normals[lens_normals] / (scale_x, scale_y, 1.0)
+        normals[lens_normals] = scaled / np.linalg.norm(scaled, axis=1, keepdims=True)
+
+        for group in template.attachments[side]:
+            in_group = mesh.vertex_groups == group
+            group_low, group_high = _bounds(mesh.vertices[in_group])
+            anchor = (group_low + group_high) / 2
+            vertices[in_group] += move(anchor) - anchor
+
+    return mesh.with_geometry(vertices, normals)
+
+@lru_cache(maxsize=FIT_CACHE_SIZE)
+def _fit(params):
+    return deform(get_template(), *params)
+
+@lru_cache(maxsize=FIT_CACHE_SIZE)
+def _fit_obj(params):
+    return _fit(params).to_obj().encode('utf-8')
+
+def fit_frame(eye_width_mm=None, bridge_width_mm=None, b_size_mm=None):
+    """Returns the fitted frame as an ObjMesh; results are cached by parameter set."""
+    return _fit(fit_parameters(eye_width_mm, bridge_width_mm, b_size_mm))
+
+def fitted_obj(eye_width_mm=None, bridge_width_mm=None, b_size_mm=None):
+    """Returns the fitted frame as OBJ bytes; results are cached by parameter set."""
+    return _fit_obj(fit_parameters(eye_width_mm, bridge_width_mm, b_size_mm))
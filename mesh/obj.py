@@ -0,0 +1,111 @@
+from dataclasses import dataclass, replace
+from typing import List, Tuple
+
+import numpy as np
+
+
+@dataclass(frozen=True)
+class ObjMesh:
+    """
+    A Wavefront OBJ file as exported from Onshape.
+
+    Vertex positions and normals are held as float arrays so they can be deformed;
+    every other line (faces, objects, materials) is kept verbatim in `layout` and
+    written back unchanged. `vertex_groups` and `normal_groups` give the index of
+    the `g` group each vertex and normal belongs to. `triangles` holds the
+    0-based vertex indices of every face, with polygons split into fans.
+    """
+    vertices: np.ndarray
+    normals: np.ndarray
+    vertex_groups: np.ndarray
+    normal_groups: np.ndarray
+    triangles: np.ndarray
+    # Either literal text or ('v' | 'vn', start, stop) runs of the arrays above.
+    layout: Tuple[object, ...]
+
+    @property
+    def group_count(self):
+        return int(self.vertex_groups.max()) + 1 if len(self.vertex_groups) else 0
+
+    def with_geometry(self, vertices, normals):
+        """Returns a copy with new vertex positions and normals and the same topology."""
+        return replace(self, vertices=vertices, normals=normals)
+
+    def to_obj(self):
+        """Formats the mesh as OBJ text."""
+        vertex_lines = [f"v {x:.6g} {y:.6g} {z:.6g} " for x, y, z in self.vertices.tolist()]
+        normal_lines = [f"vn {x:.6g} {y:.6g} {z:.6g} " for x, y, z in self.normals.tolist()]
+        out = []
+        for item in self.layout:
+            if isinstance(item, str):
+                out.append(item)
+            else:
+                kind, start, stop = item
+                out.extend((vertex_lines if kind == 'v' else normal_lines)[start:stop])
+        return '\n'.join(out) + '\n'
+
+
+def _append_run(layout, kind, index):
+    last = layout[-1] if layout else None
+    if isinstance(last, list) and last[0] == kind and last[2] == index:
+        last[2] = index + 1
+    else:
+        layout.append([kind, index, index + 1])
+
+def _resolve(index, count):
+    # OBJ indices are 1-based; negative ones count back from the last element read.
+    return index - 1 if index > 0 else count + index
+
+def parse_obj(text):
+    """
+    Parses OBJ text into an ObjMesh. Vertices and normals before the first `g`
+    line belong to group 0. Normals take the group of the vertices whose faces
+    use them.
+    """
+    vertices: List[List[float]] = []
+    normals: List[List[float]] = []
+    vertex_groups: List[int] = []
+    layout: List[object] = []
+    face_refs = []
+    triangles = []
+    group = -1
+
+    for line in text.splitlines():
+        if line.startswith('v '):
+            vertices.append([float(value) for value in line.split()[1:4]])
+            vertex_groups.append(max(group, 0))
+            _append_run(layout, 'v', len(vertices) - 1)
+            continue
+        if line.startswith('vn '):
+            normals.append([float(value) for value in line.split()[1:4]])
+            _append_run(layout, 'vn', len(normals) - 1)
+            continue
+        if line.startswith('g '):
+            group += 1
+        elif line.startswith('f '):
+            corners = []
+            for token in line.split()[1:]:
+                parts = token.split('/')
+                corners.append(_resolve(int(parts[0]), len(vertices)))
+                if len(parts) == 3 and parts[2]:
+                    face_refs.append((corners[-1], _resolve(int(parts[2]), len(normals))))
+            triangles.extend((corners[0], corners[i], corners[i + 1]) for i in range(1, len(corners) - 1))
+        layout.append(line)
+
+    vertex_groups = np.array(vertex_groups, dtype=np.int32)
+    normal_groups = np.full(len(normals), -1, dtype=np.int32)
+    for vertex_index, normal_index in face_refs:
+        normal_groups[normal_index] = vertex_groups[vertex_index]
+
+    return ObjMesh(
+        vertices=np.array(vertices, dtype=np.float64).reshape(-1, 3),
+        normals=np.array(normals, dtype=np.float64).reshape(-1, 3),
+        vertex_groups=vertex_groups,
+        normal_groups=normal_groups,
+        triangles=np.array(triangles, dtype=np.int32).reshape(-1, 3),
+        layout=tuple(item if isinstance(item, str) else tuple(item) for item in layout)
+    )
+
+def load_obj(path):
+    with open(path) as file:
+        return parse_obj(file.read())
@@ -1,83 +1,33 @@
-import requests
-import time
-import uuid
-import hashlib
-import hmac
-import base64
-import json
+import os
+
+from onshape_client import ElementRef, OnshapeClient, OnshapeError, frame_variables
 
 # --- 1. API Credentials and Resource IDs ---
-ACCESS_KEY = "YOUR_ACCESS_KEY"  # Replace with your actual key
-SECRET_KEY = "YOUR_SECRET_KEY"  # Replace with your actual secret
-document_id = "2d31f5e10fa056c96e0a75c6"
-workspace_id = "8fc670243965225a2baeaa59"
+ACCESS_KEY = os.environ.get("ONSHAPE_ACCESS_KEY", "YOUR_ACCESS_KEY")  # Replace with your actual key
+SECRET_KEY = os.environ.get("ONSHAPE_SECRET_KEY", "YOUR_SECRET_KEY")  # Replace with your actual secret
+BASE_URL = os.environ.get("ONSHAPE_BASE_URL", "https://cad.onshape.com")
+document_id = os.environ.get("ONSHAPE_DOCUMENT_ID", "2d31f5e10fa056c96e0a75c6")
+workspace_id = os.environ.get("ONSHAPE_WORKSPACE_ID", "8fc670243965225a2baeaa59")
 # Use the element ID from the document URL if that’s the correct Part Studio:
-element_id = "a377fdbdab916b853e7ea51a"  
+element_id = os.environ.get("ONSHAPE_ELEMENT_ID", "a377fdbdab916b853e7ea51a")
 
 # --- 2. Compute New Parameter Values ---
 bridge_input = 20.03
-offset = 5
 lens_len_input = 2.587
 lens_wid_input = 4.297
 
-BridgeWid = bridge_input + offset
-LensLen = lens_len_input
-LensWid = lens_wid_input
-
-# --- 3. Construct the API Request ---
-method = "POST"
-# If the API endpoint is versioned, you might need to include the version (e.g., /api/v6/...)
-path = f"/api/variables/d/{document_id}/w/{workspace_id}/e/{element_id}"
-query = ""
-
-payload = {
-    "variables": [
-        {
-            "variableId": "BridgeWid",
-            "expression": f"{BridgeWid} mm",
-            "variableType": "Length"
-        },
-        {
-            "variableId": "LensLen",
-            "expression": f"{LensLen} mm",
-            "variableType": "Length"
-        },
-        {
-            "variableId": "LensWid",
-            "expression": f"{LensWid} mm",
-            "variableType": "Length"
-        }
-    ]
-}
-# Use minified JSON to be safe:
-body = json.dumps(payload, separators=(",", ":"))
-
-# --- 4. Generate the HMAC Signature ---
-timestamp = str(int(time.time() * 1000))
-nonce = str(uuid.uuid4())
-message_to_sign = timestamp + nonce + method + path + query + body
-
-signature = base64.b64encode(
-    hmac.new(SECRET_KEY.encode('utf-8'),
-             message_to_sign.encode('utf-8'),
-             hashlib.sha256).digest()
-).decode('utf-8')
-
-headers = {
-    "Content-Type": "application/json",
-    "On-Nonce": nonce,
-    "On-Timestamp": timestamp,
-    "On-Access-Key": ACCESS_KEY,
-    "On-Signature": signature
-}
-
-# --- 5. Make the Request ---
-url = "https://cad.onshape.com" + path
-response = requests.post(url, headers=headers, data=body)
-
-if response.status_code == 200:
-    print("✅ Parameters updated successfully!")
-    print("Response:", response.json())
-else:
-    print(f"❌ Error: {response.status_code}")
-    print("Details:", response.text)
+# BridgeWid = bridge_input + 5 mm offset, LensLen and LensWid as measured. From a
+# scan, LensWid is mesh.lens_width(eye_width_mm, bridge_width_mm), as in /api/frames.
+variables = frame_variables(bridge_input, lens_len_input, lens_wid_input)
+
+# --- 3. Send the Update ---
+# The client signs the request, pools the connection and retries transient failures.
+with OnshapeClient(ACCESS_KEY, SECRET_KEY, base_url=BASE_URL) as client:
+    try:
+        result = client.update_variables(ElementRef(document_id, workspace_id, element_id), variables)
+    except OnshapeError as exc:
+        print(f"❌ Error: {exc.status}")
+        print("Details:", exc.details)
+    else:
+        print("✅ Parameters updated successfully!")
+        print("Response:", result)
@@ -0,0 +1,230 @@
+"""
+Reusable client for updating Onshape Part Studio variables.
+
+One client keeps a pooled HTTP session for all documents. It signs every
+request with the HMAC scheme used by onshape.py and retries transient failures
+with exponential backoff. Updates whose values match the last ones sent to the
+same element are skipped. Updates submitted in quick succession for one element
+are merged into a single call. `base_url` can point at a local stub server.
+"""
+import base64
+import hashlib
+import hmac
+import json
+import threading
+import time
+import uuid
+from collections import defaultdict
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import NamedTuple
+
+import requests
+from requests.adapters import HTTPAdapter
+
+DEFAULT_BASE_URL = "https://cad.onshape.com"
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+BRIDGE_OFFSET_MM = 5   # BridgeWid is the measured bridge width plus this clearance.
+
+
+class OnshapeError(Exception):
+    """
+    Raised when Onshape rejects an update, it still fails after all retries, or
+    the request or its response is unusable (invalid URL, body that is not JSON).
+    """
+
+    def __init__(self, status, details):
+        super().__init__(f"Onshape request failed ({status}): {details}")
+        self.status = status
+        self.details = details
+
+
+class ElementRef(NamedTuple):
+    """Identifies the Part Studio whose variables are updated."""
+    document_id: str
+    workspace_id: str
+    element_id: str
+
+    @property
+    def variables_path(self):
+        return f"/api/variables/d/{self.document_id}/w/{self.workspace_id}/e/{self.element_id}"
+
+
+def frame_variables(bridge_width_mm, lens_len, lens_wid, offset_mm=BRIDGE_OFFSET_MM):
+    """Maps measured frame values to the template's BridgeWid/LensLen/LensWid variables."""
+    return {'BridgeWid': bridge_width_mm + offset_mm, 'LensLen': lens_len, 'LensWid': lens_wid}
+
+def variables_body(variables):
+    """Minified JSON body for a {name: value_in_mm} dict, with variables in name order."""
+    payload = {
+        "variables": [
+            {"variableId": name, "expression": f"{value} mm", "variableType": "Length"}
+            for name, value in sorted(variables.items())
+        ]
+    }
+    return json.dumps(payload, separators=(",", ":"))
+
+def sign_headers(access_key, secret_key, method, path, query, body):
+    """Returns the authentication headers for one request; each call uses a fresh nonce."""
+    timestamp = str(int(time.time() * 1000))
+    nonce = str(uuid.uuid4())
+    message_to_sign = timestamp + nonce + method + path + query + body
+    signature = base64.b64encode(
+        hmac.new(secret_key.encode('utf-8'), message_to_sign.encode('utf-8'), hashlib.sha256).digest()
+    ).decode('utf-8')
+    return {
+        "Content-Type": "application/json",
+        "On-Nonce": nonce,
+        "On-Timestamp": timestamp,
+        "On-Access-Key": access_key,
+        "On-Signature": signature
+    }
+
+
+class _PendingUpdate:
+    def __init__(self):
+        self.variables = {}
+        self.futures = []
+        self.timer = None
+
+
+class OnshapeClient:
+    """
+    Thread-safe Onshape variable client.
+
+    update_variables() sends one update and waits for it. submit() merges updates
+    for the same element that arrive within `coalesce_s` of the first one and
+    returns a Future. update_many() sends updates for many documents concurrently.
+    All three return the parsed response, or None when the update was skipped
+    because the values were already sent.
+    """
+
+    def __init__(self, access_key, secret_key, base_url=DEFAULT_BASE_URL, pool_size=10,
+                 retries=3, backoff_s=0.5, timeout_s=10, coalesce_s=0.2):
+        self.access_key = access_key
+        self.secret_key = secret_key
+        self.base_url = base_url.rstrip('/')
+        self.retries = retries
+        self.backoff_s = backoff_s
+        self.timeout_s = timeout_s
+        self.coalesce_s = coalesce_s
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+        self._executor = ThreadPoolExecutor(max_workers=pool_size, thread_name_prefix='onshape')
+        self._lock = threading.Lock()
+        # Updates to one element are sent one at a time, so they cannot overtake each other.
+        self._element_locks = defaultdict(threading.Lock)
+        self._sent_hashes = {}
+        self._pending = {}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def _post(self, path, body):
+        url = self.base_url + path
+        for attempt in range(self.retries + 1):
+            last_attempt = attempt == self.retries
+            # Signatures include a timestamp and nonce, so every attempt is signed anew.
+            headers = sign_headers(self.access_key, self.secret_key, "POST", path, "", body)
+            try:
+                response = self.session.post(url, headers=headers, data=body, timeout=self.timeout_s)
+            except (requests.ConnectionError, requests.Timeout) as exc:
+                if last_attempt:
+                    raise OnshapeError(None, str(exc)) from exc
+                delay = self.backoff_s * 2 ** attempt
+            except requests.RequestException as exc:
+                # An invalid URL or similar; retrying cannot help.
+                raise OnshapeError(None, str(exc)) from exc
+            else:
+                if response.ok:
+                    try:
+                        return response.json() if response.content else None
+                    except ValueError as exc:
+                        raise OnshapeError(response.status_code,
+                                           f"invalid JSON response: {response.text[:200]}") from exc
+                if response.status_code not in RETRY_STATUSES or last_attempt:
+                    raise OnshapeError(response.status_code, response.text)
+                retry_after = response.headers.get('Retry-After', '')
+                delay = float(retry_after) if retry_after.isdigit() else self.backoff_s * 2 ** attempt
+            time.sleep(delay)
+
+    def update_variables(self, element, variables, force=False):
+        """
+        Sets the element's variables ({name: value_in_mm}) and returns the response.
+        Skips the call and returns None when the same values were last sent to
+        this element, unless `force` is set.
+        """
+        body = variables_body(variables)
+        content_hash = hashlib.sha256(body.encode('utf-8')).hexdigest()
+        with self._element_locks[element]:
+            if not force and self._sent_hashes.get(element) == content_hash:
+                return None
+            result = self._post(element.variables_path, body)
+            self._sent_hashes[element] = content_hash
+            return result
+
+    def submit(self, element, variables):
+        """
+        Queues an update and returns a Future for its result. Updates to the same
+        element submitted before the queued one is sent are merged into it, later
+        values winning, and their futures share the one call's result.
+        """
+        future = Future()
+        with self._lock:
+            pending = self._pending.get(element)
+            if pending is None:
+                pending = self._pending[element] = _PendingUpdate()
+                pending.timer = threading.Timer(self.coalesce_s, self._executor.submit, (self._flush, element))
+                pending.timer.daemon = True
+                pending.timer.start()
+            pending.variables.update(variables)
+            pending.futures.append(future)
+        return future
+
+    def _flush(self, element):
+        with self._lock:
+            pending = self._pending.pop(element, None)
+        if pending is None:
+            return
+        pending.timer.cancel()
+        try:
+            result = self.update_variables(element, pending.variables)
+        except Exception as exc:
+            for future in pending.futures:
+                future.set_exception(exc)
+        else:
+            for future in pending.futures:
+                future.set_result(result)
+
+    def flush(self):
+        """Sends every queued update now and waits for them."""
+        with self._lock:
+            elements = list(self._pending)
+        for future in [self._executor.submit(self._flush, element) for element in elements]:
+            future.result()
+
+    def update_many(self, updates):
+        """
+        Sends (element, variables) updates concurrently over the shared pool.
+        Returns a list in input order holding each response, None for skipped
+        updates, or the OnshapeError that update raised.
+        """
+        futures = [self._executor.submit(self.update_variables, element, variables)
+                   for element, variables in updates]
+        results = []
+        for future in futures:
+            try:
+                results.append(future.result())
+            except OnshapeError as exc:
+                results.append(exc)
+        return results
+
+    def close(self):
+        """Sends queued updates, then releases the worker threads and connections."""
+        self.flush()
+        self._executor.shutdown(wait=True)
+        self.session.close()
@@ -0,0 +1,104 @@
+from concurrent.futures import Future
+
+import cv2
+import numpy as np
+import pytest
+
+from app import ERROR_DECODE, ERROR_IMAGE_TYPE, ERROR_WORKER_CRASHED, app, raw_frame_size
+from frame_pool import PoolBrokenError, PoolTimeoutError
+from measurement import ERROR_MOTION
+
+
+@pytest.fixture
+def client():
+    return app.test_client()
+
+
+@pytest.mark.parametrize('images, index', [([123], 0), (['aGVsbG8=', None], 1), (['aGVsbG8=', {'data': 'x'}], 1)])
+def test_batch_rejects_non_string_images_with_their_index(client, images, index):
+    response = client.post('/api/measure/batch', json={'images': images})
+    assert response.status_code == 400
+    assert response.get_json() == {'error': ERROR_IMAGE_TYPE, 'index': index}
+
+
+def test_measure_rejects_non_string_image(client):
+    response = client.post('/api/measure', json={'image': 123})
+    assert response.status_code == 400
+    assert response.get_json() == {'error': ERROR_DECODE}
+
+
+@pytest.mark.parametrize('body', [[1, 2], 'image', {}])
+def test_measure_rejects_non_object_json(client, body):
+    response = client.post('/api/measure', json=body)
+    assert response.status_code == 400
+    assert response.get_json() == {'error': 'No image provided.'}
+
+
+@pytest.mark.parametrize('body', [[1, 2], 'images', {'images': 'x'}])
+def test_batch_rejects_non_object_json(client, body):
+    response = client.post('/api/measure/batch', json=body)
+    assert response.status_code == 400
+    assert response.get_json() == {'error': 'No images provided.'}
+
+
+def test_crashed_worker_answers_503_with_retry_after(client, monkeypatch):
+    def broken(*args, **kwargs):
+        raise PoolBrokenError()
+    monkeypatch.setattr('app.measure_frame', broken)
+    response = client.post('/api/measure', json={'image': 'aGVsbG8='})
+    assert response.status_code == 503
+    assert response.headers['Retry-After'] == '1'
+    assert response.get_json() == {'error': ERROR_WORKER_CRASHED}
+
+
+@pytest.mark.parametrize('plane_format, width, height, size', [
+    ('gray', 5, 3, 15),
+    ('i420', 4, 2, 12),
+    ('i420', 5, 3, 15 + 2 * 3 * 2),
+    ('nv12', 641, 481, 641 * 481 + 2 * 321 * 241),
+])
+def test_raw_frame_size_rounds_chroma_up(plane_format, width, height, size):
+    assert raw_frame_size(plane_format, width, height) == size
+
+
+def test_raw_frame_with_wrong_size_is_rejected(client):
+    response = client.post('/api/measure/raw?format=i420&width=5&height=3', data=bytes(22),
+                           content_type='application/octet-stream')
+    assert response.status_code == 400
+
+
+def test_frames_are_hashed_only_for_cached_sessions(client, monkeypatch):
+    hashed = []
+    monkeypatch.setattr('app.encoded_frame_hash', lambda encoded: hashed.append(encoded))
+    monkeypatch.setattr('app.measure_frame', lambda call, frame_hash, session_id: ({}, None))
+    client.post('/api/measure', json={'image': 'aGVsbG8='})
+    assert hashed == []
+    client.post('/api/measure', json={'image': 'aGVsbG8='}, headers={'X-Session-ID': 's'})
+    assert len(hashed) == 1
+    monkeypatch.setattr('app.FRAME_CACHE_TTL_S', 0)
+    client.post('/api/measure', json={'image': 'aGVsbG8='}, headers={'X-Session-ID': 's'})
+    assert len(hashed) == 1
+
+
+def test_batch_timeout_cancels_the_remaining_frames(client, monkeypatch):
+    futures = [Future() for _ in range(3)]
+    monkeypatch.setattr('app.frame_pool.submit_many', lambda fn, args_list: futures)
+    def timeout(future, deadline):
+        raise PoolTimeoutError()
+    monkeypatch.setattr('app.frame_pool.result', timeout)
+    response = client.post('/api/measure/batch', json={'images': ['aGVsbG8='] * 3})
+    assert response.status_code == 504
+    assert all(future.cancelled() for future in futures)
+
+
+def test_session_frames_are_checked_for_motion(client):
+    board = np.where((np.indices((480, 640)) // 40).sum(axis=0) % 2, 190, 60).astype(np.uint8)
+    still = cv2.imencode('.png', board)[1].tobytes()
+    moved = cv2.imencode('.png', 250 - board)[1].tobytes()
+    headers = {'X-Session-ID': 'motion'}
+    for body in (still, moved):
+        response = client.post('/api/measure/raw', data=body, content_type='image/png', headers=headers)
+    assert response.get_json() == {'error': ERROR_MOTION}
+    # Without a session there is no previous frame to compare with.
+    response = client.post('/api/measure/raw', data=moved, content_type='image/png')
+    assert response.get_json() != {'error': ERROR_MOTION}
@@ -0,0 +1,28 @@
+import numpy as np
+import pytest
+
+from benchmark import SYNTH_GROUND_TRUTH, synthesize_face
+from measurement import CONFIGS, MEASUREMENT_KEYS, measure
+
+TOLERANCE_MM = 2.5
+
+
+@pytest.mark.parametrize('config_name', sorted(CONFIGS))
+@pytest.mark.parametrize('seed', range(4))
+def test_clean_synthetic_frame_matches_ground_truth(config_name, seed):
+    result = measure(synthesize_face(np.random.default_rng(seed), clean=True), CONFIGS[config_name])
+    assert result.error is None
+    for key in MEASUREMENT_KEYS:
+        assert abs(result.measurement[key] - SYNTH_GROUND_TRUTH[key]) < TOLERANCE_MM, key
+
+
+def test_synthetic_corpus_is_unbiased():
+    # Exposure, noise and blur vary from frame to frame; the mean must still land on the truth.
+    rng = np.random.default_rng(0)
+    measurements = []
+    for _ in range(20):
+        result = measure(synthesize_face(rng), CONFIGS['server'])
+        assert result.error is None
+        measurements.append([result.measurement[key] for key in MEASUREMENT_KEYS])
+    bias = np.mean(measurements, axis=0) - [SYNTH_GROUND_TRUTH[key] for key in MEASUREMENT_KEYS]
+    assert np.all(np.abs(bias) < 1.5), dict(zip(MEASUREMENT_KEYS, bias))
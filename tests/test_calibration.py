@@ -0,0 +1,35 @@
+import pytest
+
+from measurement import ScaleCalibration
+
+
+def calibrated(scale=0.4, face_width=400):
+    calibration = ScaleCalibration(frames=5, max_face_change=0.1, max_scale_change=0.015)
+    for _ in range(5):
+        calibration.add(face_width, scale)
+    assert calibration.mm_per_pixel == scale
+    return calibration
+
+
+def test_frame_jitter_keeps_the_session_scale():
+    calibration = calibrated()
+    for frame_scale in (0.401, 0.398, 0.403, 0.399, 0.402, 0.397) * 3:
+        assert calibration.scale(400, frame_scale) == 0.4
+    assert calibration.recalibrations == 0
+
+
+def test_leaning_in_moves_the_scale_within_a_few_frames():
+    # 6% closer: the face box grows less than max_face_change, the pupils 6% further apart.
+    calibration = calibrated()
+    leaned = 0.4 / 1.06
+    scales = [calibration.scale(424, leaned) for _ in range(5)]
+    assert scales[-1] == pytest.approx(leaned)
+    assert calibration.recalibrations == 1
+    assert calibration.scale(424, leaned) == pytest.approx(leaned)
+
+
+def test_a_different_face_size_starts_a_new_calibration():
+    calibration = calibrated()
+    assert calibration.scale(480, 0.33) is None
+    assert not calibration.calibrated
+    assert calibration.recalibrations == 1
@@ -0,0 +1,61 @@
+import threading
+import time
+
+import numpy as np
+
+from capture import LatestFrameReader
+
+
+class SlowCapture:
+    """A VideoCapture stand-in whose read() takes a while, like a camera waiting for its next frame."""
+
+    def __init__(self, read_seconds=0.05):
+        self.read_seconds = read_seconds
+        self.reading = threading.Event()
+        self.released_while_reading = False
+
+    def read(self):
+        self.reading.set()
+        time.sleep(self.read_seconds)
+        self.reading.clear()
+        return True, np.zeros((4, 4, 3), np.uint8)
+
+    def release(self):
+        self.released_while_reading = self.reading.is_set()
+
+
+def test_stop_waits_for_pending_read_before_release():
+    cap = SlowCapture()
+    reader = LatestFrameReader(cap).start()
+    assert reader.read() is not None
+    cap.reading.wait(1)
+    reader.stop()
+    cap.release()
+    assert not cap.released_while_reading
+    assert not reader._thread.is_alive()
+
+
+def test_reader_stops_itself_when_the_camera_fails():
+    class FailingCapture:
+        def read(self):
+            return False, None
+
+    reader = LatestFrameReader(FailingCapture()).start()
+    assert reader.read() is None
+    reader.stop()
+
+
+def test_reader_retries_a_few_failed_reads():
+    class FlakyCapture:
+        def __init__(self):
+            self.reads = 0
+
+        def read(self):
+            self.reads += 1
+            return self.reads % 3 != 0, np.zeros((4, 4, 3), np.uint8)
+
+    reader = LatestFrameReader(FlakyCapture(), max_failed_reads=2).start()
+    for _ in range(5):
+        assert reader.read() is not None
+    reader.stop()
+    assert reader.failed_reads >= 1
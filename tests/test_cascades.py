@@ -0,0 +1,36 @@
+import threading
+
+from measurement import borrowed_cascades, get_cascade
+from measurement.cascades import FACE_CASCADE
+
+
+def _cascade_in_new_thread(hold=None, release=None):
+    found = []
+    def run():
+        with borrowed_cascades():
+            found.append(get_cascade(FACE_CASCADE))
+            if hold is not None:
+                hold.set()
+                release.wait(5)
+    thread = threading.Thread(target=run)
+    thread.start()
+    return thread, found
+
+
+def test_short_lived_threads_reuse_loaded_cascades():
+    first, found_first = _cascade_in_new_thread()
+    first.join()
+    second, found_second = _cascade_in_new_thread()
+    second.join()
+    assert found_first[0] is found_second[0]
+
+
+def test_concurrent_threads_never_share_a_cascade():
+    hold, release = threading.Event(), threading.Event()
+    holder, held = _cascade_in_new_thread(hold, release)
+    hold.wait(5)
+    other, found = _cascade_in_new_thread()
+    other.join()
+    release.set()
+    holder.join()
+    assert found[0] is not held[0]
@@ -0,0 +1,55 @@
+from measurement import SCALE_KEY, StreamingEstimator
+
+STILL = {'eye_width_mm': 60.0, 'bridge_width_mm': 20.0, 'b_size_mm': 30.0}
+
+
+def shifted(pixels, scale=0.4):
+    # A frame whose every dimension is `pixels` pixels off the still subject's.
+    return {**{key: value + pixels * scale for key, value in STILL.items()}, SCALE_KEY: scale}
+
+
+def test_one_pixel_jitter_of_a_still_subject_is_accepted():
+    estimator = StreamingEstimator(min_frames=10)
+    for _ in range(10):
+        estimator.add(shifted(0))
+    assert all(estimator.add(shifted(pixels)) for pixels in (1, -1, 2, -2))
+    assert estimator.rejected == 0
+
+
+def test_frames_many_pixels_off_are_still_rejected():
+    estimator = StreamingEstimator(min_frames=10)
+    for _ in range(10):
+        estimator.add(shifted(0))
+    assert not estimator.add(shifted(10))
+    assert estimator.rejected == 1
+
+
+def test_measurements_without_a_scale_use_the_mm_floor():
+    estimator = StreamingEstimator(min_frames=10, min_spread_mm=0.3)
+    for _ in range(10):
+        estimator.add(dict(STILL))
+    assert estimator.add({key: value + 0.5 for key, value in STILL.items()})
+    assert not estimator.add({key: value + 1.0 for key, value in STILL.items()})
+    assert set(estimator.estimate()) == {*STILL, 'left_ear_offset_mm', 'right_ear_offset_mm'}
+
+
+def test_a_lasting_shift_reanchors_the_estimate():
+    # 8 frames at one scale, then the subject leans in and every dimension grows 5%.
+    estimator = StreamingEstimator(min_frames=8)
+    for _ in range(8):
+        estimator.add(shifted(0))
+    leaned = {**{key: value * 1.05 for key, value in STILL.items()}, SCALE_KEY: 0.4}
+    accepted = [estimator.add(leaned) for _ in range(30)]
+    # Rejected until the run is long enough to re-anchor on, accepted from then on.
+    assert accepted == [False] * 7 + [True] * 23
+    assert estimator.reanchors == 1
+    assert estimator.converged()
+    assert abs(estimator.estimate()['eye_width_mm'] - 63.0) < 0.01
+
+
+def test_warmup_frames_are_counted_and_estimated():
+    estimator = StreamingEstimator(min_frames=10)
+    for _ in range(3):
+        estimator.add(shifted(0))
+    assert len(estimator) == 3
+    assert estimator.estimate()['eye_width_mm'] == STILL['eye_width_mm']
@@ -0,0 +1,29 @@
+import pytest
+
+from mesh import IRIS_DIAMETER_MM, clamp_parameters, get_template, lens_width
+
+
+def test_typical_scan_maps_to_a_lens_width_without_clamping():
+    params, clamped = clamp_parameters(75.6, 20.8, 25.3)
+    assert clamped == {}
+    assert params == (43.1, 20.8, 25.3)
+    # Lens plus bridge is the pupil distance, as for Onshape's LensWid.
+    assert params[0] + params[1] == pytest.approx(75.6 - IRIS_DIAMETER_MM, abs=0.1)
+
+
+def test_missing_bridge_uses_the_template_bridge_for_the_lens_width():
+    params, _ = clamp_parameters(eye_width_mm=75.6)
+    template = get_template().dimensions
+    assert params[0] == round(lens_width(75.6, template['bridge_width_mm']), 1)
+    assert params[1:] == (template['bridge_width_mm'], template['b_size_mm'])
+
+
+def test_outlier_is_clamped():
+    params, clamped = clamp_parameters(40.0, 20.0, 25.0)
+    assert clamped == {'lens_width_mm': 30}
+    assert params[0] == 30
+
+
+def test_non_numeric_value_is_rejected():
+    with pytest.raises(ValueError):
+        clamp_parameters('wide', 20.0, 25.0)
@@ -0,0 +1,56 @@
+import numpy as np
+
+import frame_cache
+from frame_cache import FrameCache, dhash
+
+
+def test_near_duplicate_hash_hits_and_distant_hash_misses():
+    cache = FrameCache(max_distance=4)
+    cache.store('a', 0b1111, 'result')
+    assert cache.lookup('a', 0b0111) == 'result'       # 1 bit apart
+    assert cache.lookup('a', 0b1111 ^ 0x1F0) is None   # 5 bits apart
+    assert cache.lookup('b', 0b1111) is None           # other session
+    assert (cache.hits, cache.misses) == (1, 2)
+
+
+def test_entries_expire_after_ttl(monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr(frame_cache.time, 'monotonic', lambda: now[0])
+    cache = FrameCache(ttl_s=10)
+    cache.store('a', 1, 'result')
+    now[0] = 109.9
+    assert cache.lookup('a', 1) == 'result'
+    now[0] = 110.0
+    assert cache.lookup('a', 1) is None
+    assert len(cache) == 0
+
+
+def test_each_session_keeps_its_most_recent_entries():
+    cache = FrameCache(entries_per_session=2, max_distance=0)
+    cache.store('a', 1, 'one')
+    cache.store('a', 2, 'two')
+    assert cache.lookup('a', 1) == 'one'   # a hit makes 1 the most recent
+    cache.store('a', 3, 'three')
+    assert cache.lookup('a', 2) is None
+    assert cache.lookup('a', 1) == 'one'
+    assert cache.lookup('a', 3) == 'three'
+
+
+def test_least_recently_used_session_is_dropped():
+    cache = FrameCache(max_sessions=2)
+    cache.store('a', 1, 'a')
+    cache.store('b', 1, 'b')
+    cache.lookup('a', 1)
+    cache.store('c', 1, 'c')
+    assert cache.lookup('b', 1) is None
+    assert cache.lookup('a', 1) == 'a'
+    assert cache.stats()['sessions'] == 2
+
+
+def test_dhash_ignores_noise_but_not_a_different_frame():
+    rng = np.random.default_rng(0)
+    frame = np.tile(np.linspace(0, 255, 640), (480, 1)).astype(np.uint8)
+    frame[100:300, 200:400] = 40
+    noisy = np.clip(frame + rng.normal(0, 3, frame.shape), 0, 255).astype(np.uint8)
+    assert bin(dhash(frame) ^ dhash(noisy)).count('1') <= 4
+    assert bin(dhash(frame) ^ dhash(frame[:, ::-1])).count('1') > 4
@@ -0,0 +1,25 @@
+import os
+
+import pytest
+
+from frame_pool import FramePool, PoolBrokenError
+
+
+def crash():
+    os._exit(1)
+
+
+def square(value):
+    return value * value
+
+
+def test_crashed_worker_raises_pool_broken_and_pool_recovers():
+    pool = FramePool(workers=1, max_queued=4, timeout_s=30)
+    try:
+        future = pool.submit(crash)
+        with pytest.raises(PoolBrokenError):
+            pool.result(future, pool.deadline())
+        # The broken executor was dropped, so the next frame gets a fresh one.
+        assert pool.result(pool.submit(square, 7), pool.deadline()) == 49
+    finally:
+        pool.shutdown()
@@ -0,0 +1,104 @@
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from onshape_client import ElementRef, OnshapeClient, OnshapeError
+
+ELEMENT = ElementRef('doc', 'ws', 'el')
+OTHER_ELEMENT = ElementRef('doc', 'ws', 'other')
+
+
+class StubOnshape(ThreadingHTTPServer):
+    """Local Onshape stand-in: answers each POST with the next scripted (status, body) and records the request."""
+
+    def __init__(self, responses=()):
+        super().__init__(('127.0.0.1', 0), StubHandler)
+        self.responses = list(responses)
+        self.requests = []
+        self.lock = threading.Lock()
+
+    @property
+    def base_url(self):
+        return f"http://127.0.0.1:{self.server_address[1]}"
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    def do_POST(self):
+        body = self.rfile.read(int(self.headers['Content-Length']))
+        with self.server.lock:
+            self.server.requests.append((self.path, json.loads(body)))
+            status, payload = self.server.responses.pop(0) if self.server.responses else (200, '{"ok": true}')
+        data = payload.encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def stub():
+    server = StubOnshape()
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def client_for(stub, **kwargs):
+    return OnshapeClient('key', 'secret', base_url=stub.base_url, backoff_s=0.01, **kwargs)
+
+
+def sent_values(body):
+    return {variable['variableId']: variable['expression'] for variable in body['variables']}
+
+
+def test_retries_503_with_backoff(stub):
+    stub.responses = [(503, 'busy'), (503, 'busy'), (200, '{"ok": true}')]
+    with client_for(stub, retries=3) as client:
+        assert client.update_variables(ELEMENT, {'LensWid': 43.1}) == {'ok': True}
+    assert len(stub.requests) == 3
+    assert stub.requests[0][0] == ELEMENT.variables_path
+
+
+def test_gives_up_after_the_last_retry(stub):
+    stub.responses = [(503, 'busy')] * 3
+    with client_for(stub, retries=2) as client:
+        with pytest.raises(OnshapeError) as info:
+            client.update_variables(ELEMENT, {'LensWid': 43.1})
+    assert info.value.status == 503
+    assert len(stub.requests) == 3
+
+
+def test_unchanged_values_are_skipped(stub):
+    with client_for(stub) as client:
+        assert client.update_variables(ELEMENT, {'LensWid': 43.1, 'LensLen': 25.9}) == {'ok': True}
+        assert client.update_variables(ELEMENT, {'LensLen': 25.9, 'LensWid': 43.1}) is None
+        assert client.update_variables(OTHER_ELEMENT, {'LensWid': 43.1, 'LensLen': 25.9}) == {'ok': True}
+        assert client.update_variables(ELEMENT, {'LensWid': 43.1, 'LensLen': 25.9}, force=True) == {'ok': True}
+    assert len(stub.requests) == 3
+
+
+def test_submit_merges_updates_into_one_call(stub):
+    with client_for(stub, coalesce_s=0.5) as client:
+        first = client.submit(ELEMENT, {'LensWid': 43.0, 'LensLen': 25.9})
+        second = client.submit(ELEMENT, {'LensWid': 43.1, 'BridgeWid': 25.8})
+        assert first.result(5) == second.result(5) == {'ok': True}
+    assert len(stub.requests) == 1
+    assert sent_values(stub.requests[0][1]) == {'BridgeWid': '25.8 mm', 'LensLen': '25.9 mm', 'LensWid': '43.1 mm'}
+
+
+def test_update_many_collects_every_failure(stub):
+    stub.responses = [(200, 'not json')]
+    with client_for(stub, retries=0) as client:
+        results = client.update_many([(ELEMENT, {'LensWid': 43.1})])
+    assert isinstance(results[0], OnshapeError) and results[0].status == 200
+
+    with OnshapeClient('key', 'secret', base_url='http://', retries=0) as client:
+        results = client.update_many([(ELEMENT, {'LensWid': 43.1}), (OTHER_ELEMENT, {'LensWid': 43.1})])
+    assert all(isinstance(result, OnshapeError) for result in results)
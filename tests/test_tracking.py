@@ -0,0 +1,41 @@
+import numpy as np
+import pytest
+
+from benchmark import synthesize_face
+from measurement import MEASUREMENT_KEYS, WEBCAM_CONFIG, FaceTracker, measure
+
+CLIP_FRAMES = 40
+
+
+@pytest.mark.parametrize('seed', range(4))
+def test_tracked_static_clip_matches_full_search(seed):
+    # A static clip: the same frame over and over. Tracking must not move the
+    # estimate away from what a full search of that frame measures.
+    frame = synthesize_face(np.random.default_rng(seed))
+    untracked = measure(frame, WEBCAM_CONFIG).measurement
+    assert untracked is not None
+
+    tracker = FaceTracker(WEBCAM_CONFIG.tracker_padding, WEBCAM_CONFIG.lost_frame_threshold,
+                          WEBCAM_CONFIG.tracker_refresh_interval)
+    tracked = []
+    for _ in range(CLIP_FRAMES):
+        result = measure(frame, WEBCAM_CONFIG, tracker)
+        assert result.error is None
+        tracked.append([result.measurement[key] for key in MEASUREMENT_KEYS])
+    tracked = np.array(tracked)
+
+    for column, key in enumerate(MEASUREMENT_KEYS):
+        assert abs(np.median(tracked[:, column]) - untracked[key]) < 2.5, key
+    # No ratchet: the end of the clip is no further off than its start.
+    late, early = tracked[-10:].mean(axis=0), tracked[:10].mean(axis=0)
+    assert np.all(np.abs(late - early) < 2.5)
+
+
+def test_tracked_eye_sizes_stay_anchored_to_full_search():
+    frame = synthesize_face(np.random.default_rng(0))
+    tracker = FaceTracker(refresh_interval=1000)
+    measure(frame, WEBCAM_CONFIG, tracker)
+    reference = list(tracker.eye_sizes)
+    for _ in range(CLIP_FRAMES):
+        measure(frame, WEBCAM_CONFIG, tracker)
+    assert tracker.eye_sizes == reference